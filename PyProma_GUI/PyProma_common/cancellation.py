@@ -0,0 +1,114 @@
+import subprocess
+import threading
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """this exception is raised when work of a cancelled token goes on.
+    """
+
+
+class CancelToken:
+    """this class tells background work of a plugin that its result is
+    no longer needed.
+
+    a token belongs to a refresh generation of PluginLoader and is
+    cancelled when the next generation starts. callbacks added by
+    on_cancel (e.g. killing a subprocess) are called once on cancel.
+    """
+
+    def __init__(self, generation: int = 0):
+        self.generation = generation
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback):
+        """this func adds a callback called when token is cancelled.
+        callback is called at once if token is already cancelled.
+
+        Args:
+            callback (callable): function without arguments
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self):
+        """this func stops work of a cancelled token.
+
+        Raises:
+            Cancelled: token is cancelled
+        """
+        if self._event.is_set():
+            raise Cancelled()
+
+
+def current_token() -> CancelToken | None:
+    return getattr(_local, "token", None)
+
+
+def set_current_token(token: CancelToken | None):
+    """this func sets the token of work running in this thread.
+    run_command uses it.
+
+    Args:
+        token (CancelToken | None): token or None
+    """
+    _local.token = token
+
+
+def run_command(args: list, **kwargs) -> subprocess.CompletedProcess:
+    """this func runs a command like subprocess.run(capture_output=True)
+    and kills it when the current token of this thread is cancelled.
+
+    Args:
+        args (list): command
+        **kwargs: arguments of subprocess.Popen
+
+    Raises:
+        Cancelled: current token is cancelled
+
+    Returns:
+        subprocess.CompletedProcess: result of command
+    """
+    token = current_token()
+    if token is not None:
+        token.check()
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+    if token is not None:
+        token.on_cancel(process.kill)
+    try:
+        stdout, stderr = process.communicate()
+    finally:
+        if token is not None:
+            token.remove_callback(process.kill)
+    if token is not None:
+        token.check()
+    return subprocess.CompletedProcess(
+        args, process.returncode, stdout, stderr)
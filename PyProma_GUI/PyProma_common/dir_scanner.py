@@ -0,0 +1,113 @@
+import os
+import queue
+import threading
+
+from PyProma_common import fs_watcher
+from PyProma_common.project_index import KIND_DIR, KIND_FILE, ProjectIndex
+
+ENTRIES = "entries"
+CHANGES = "changes"
+
+
+class DirScanner(threading.Thread):
+    """this class builds a ProjectIndex in a worker thread.
+
+    (ENTRIES, indexes) is put into entries for each listed directory,
+    (CHANGES, events) for each cached directory which has changed, and
+    None when the scan is finished.
+    """
+
+    def __init__(self, root: str, ignore=None, cached=None):
+        """this constructor prepares an index for root.
+
+        Args:
+            root (str): path to project directory
+            ignore (IgnoreMatcher, optional): ignore matcher.
+                Defaults to None.
+            cached (ProjectIndex, optional): index loaded from the scan
+                cache. if given, it is streamed at once and only
+                directories whose mtime changed are listed again.
+                Defaults to None.
+        """
+        super().__init__(daemon=True)
+        self.root = os.path.normpath(root)
+        self.ignore = ignore
+        self.cached = cached
+        self.index = cached if cached is not None else ProjectIndex()
+        self.index.root = self.root
+        self.entries = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def run(self):
+        if self.cached is not None:
+            self.stream_cached()
+            self.revalidate()
+        else:
+            self.index.build(
+                self.root, self.ignore, self.cancelled,
+                lambda children: self.entries.put((ENTRIES, children)))
+        if not self.cancelled.is_set():
+            self.entries.put(None)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def stream_cached(self):
+        """this func puts cached entries directory by directory.
+        """
+        index = self.index
+        directories = [0]
+        for directory in directories:
+            if self.cancelled.is_set():
+                return
+            children = list(index.children(directory))
+            if children:
+                self.entries.put((ENTRIES, children))
+            directories.extend(
+                child for child in children if index.is_dir(child))
+
+    def revalidate(self):
+        """this func lists again only cached directories whose mtime
+        changed and puts differences as fs_watcher events.
+        the index itself is updated by whoever applies the events.
+        """
+        index = self.index
+        for directory in range(len(index)):
+            if self.cancelled.is_set():
+                return
+            if index.kinds[directory] != KIND_DIR:
+                continue
+            path = index.path(directory)
+            try:
+                if os.stat(path).st_mtime == index.mtimes[directory]:
+                    continue
+            except OSError:
+                continue
+            cached = {
+                index.names[child]: child
+                for child in index.children(directory)}
+            events = []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        if self.ignore is not None and self.ignore.is_ignored(
+                                entry.path, is_dir):
+                            continue
+                        child = cached.pop(entry.name, None)
+                        if child is None:
+                            events.append((fs_watcher.CREATED, entry.path))
+                        elif index.kinds[child] == KIND_FILE and (
+                                index.sizes[child] != stat.st_size
+                                or index.mtimes[child] != stat.st_mtime):
+                            events.append((fs_watcher.MODIFIED, entry.path))
+            except OSError:
+                continue
+            for name in cached:
+                events.append((fs_watcher.DELETED, os.path.join(path, name)))
+            events.append((fs_watcher.MODIFIED, path))
+            self.entries.put((CHANGES, events))
@@ -0,0 +1,214 @@
+import json
+import os
+import queue
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from PyProma_common.project_index import KIND_DIR, KIND_FILE, KIND_REMOVED
+from PyProma_common.user_cache import project_cache_path
+
+FLUSH_SIZE = 256
+
+
+def count_lines(path: str) -> int:
+    """this func counts lines of a file without decoding it.
+
+    Args:
+        path (str): path to file
+
+    Returns:
+        int: number of lines (0 if file can't be read)
+    """
+    lines = 0
+    last = b"\n"
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return 0
+    return lines + (last != b"\n")
+
+
+def format_size(size: int) -> str:
+    """this func formats bytes for humans.
+
+    Args:
+        size (int): size in bytes
+
+    Returns:
+        str: size such as "1.5 MB"
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return f"{size} B" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def line_cache_path(dir_path: str) -> str | None:
+    return project_cache_path(dir_path, "line_counts.json")
+
+
+def load_line_cache(dir_path: str) -> dict:
+    """this func reads line counts saved for dir_path.
+
+    Args:
+        dir_path (str): path to project directory
+
+    Returns:
+        dict: relative path -> [mtime, size, lines]
+    """
+    if (path := line_cache_path(dir_path)) is None:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_line_cache(dir_path: str, cache: dict):
+    """this func writes line counts of dir_path to the cache file.
+
+    Args:
+        dir_path (str): path to project directory
+        cache (dict): relative path -> [mtime, size, lines]
+    """
+    try:
+        if (path := line_cache_path(dir_path)) is None:
+            return
+        with open(path + ".tmp", "w") as f:
+            json.dump(cache, f)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+class DirStats(threading.Thread):
+    """this class computes size, file count and Python line count of
+    every entry of a ProjectIndex in a worker thread.
+
+    sizes and file counts come from the index and are summed bottom-up
+    at once. lines of .py files whose mtime and size are not in cache
+    are counted by a thread pool and added to their ancestors while
+    they arrive. lists of updated indexes are put into results, and
+    None when everything is counted.
+    """
+
+    def __init__(self, index, cache: dict = None, workers: int = None):
+        """this constructor prepares columns for index.
+
+        Args:
+            index (ProjectIndex): finished index
+            cache (dict, optional): relative path -> [mtime, size, lines].
+                it is updated with counted files. Defaults to None.
+            workers (int, optional): threads of the pool.
+                Defaults to None (chosen by ThreadPoolExecutor).
+        """
+        super().__init__(daemon=True)
+        self.index = index
+        self.cache = {} if cache is None else cache
+        self.workers = workers
+        self.count = len(index)
+        self.sizes = array("q", bytes(8 * self.count))
+        self.files = array("q", bytes(8 * self.count))
+        self.lines = array("q", bytes(8 * self.count))
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def values(self, entry: int) -> tuple:
+        """this func makes dir_tree column values of entry.
+
+        Args:
+            entry (int): index of entry
+
+        Returns:
+            tuple: (size, files, lines). unknown values are "".
+        """
+        if entry >= self.count:
+            return ("", "", "")
+        is_dir = self.index.kinds[entry] == KIND_DIR
+        is_py = self.index.names[entry].endswith(".py")
+        return (
+            format_size(self.sizes[entry]),
+            self.files[entry] if is_dir else "",
+            self.lines[entry] if is_dir or is_py else "")
+
+    def run(self):
+        pending = self.collect()
+        self.results.put(range(self.count))
+        if pending and not self.cancelled.is_set():
+            self.count_pending(pending)
+        if not self.cancelled.is_set():
+            self.results.put(None)
+
+    def collect(self) -> list:
+        """this func sums sizes, file counts and cached line counts up to
+        the root, and drops cached files which are not indexed.
+
+        Returns:
+            list: (index, relative path) of .py files to count
+        """
+        index = self.index
+        pending = []
+        seen = set()
+        for entry in range(1, self.count):
+            if index.kinds[entry] != KIND_FILE:
+                continue
+            self.sizes[entry] = index.sizes[entry]
+            self.files[entry] = 1
+            if index.names[entry].endswith(".py"):
+                relpath = index.relpath(entry)
+                seen.add(relpath)
+                cached = self.cache.get(relpath)
+                if cached and cached[:2] == [
+                        index.mtimes[entry], index.sizes[entry]]:
+                    self.lines[entry] = cached[2]
+                else:
+                    pending.append((entry, relpath))
+        for relpath in self.cache.keys() - seen:
+            del self.cache[relpath]
+        for entry in range(self.count - 1, 0, -1):
+            if index.kinds[entry] != KIND_REMOVED:
+                parent = index.parents[entry]
+                self.sizes[parent] += self.sizes[entry]
+                self.files[parent] += self.files[entry]
+                self.lines[parent] += self.lines[entry]
+        return pending
+
+    def count_pending(self, pending: list):
+        """this func counts lines of pending files in the pool and adds
+        them to ancestors.
+
+        Args:
+            pending (list): (index, relative path) of .py files
+        """
+        index = self.index
+        paths = [os.path.join(index.root, relpath) for _, relpath in pending]
+        updated = set()
+        with ThreadPoolExecutor(self.workers) as pool:
+            for (entry, relpath), lines in zip(
+                    pending, pool.map(count_lines, paths)):
+                if self.cancelled.is_set():
+                    pool.shutdown(cancel_futures=True)
+                    return
+                self.cache[relpath] = [
+                    index.mtimes[entry], index.sizes[entry], lines]
+                self.lines[entry] = lines
+                updated.add(entry)
+                parent = index.parents[entry]
+                while parent != -1:
+                    self.lines[parent] += lines
+                    updated.add(parent)
+                    parent = index.parents[parent]
+                if len(updated) >= FLUSH_SIZE:
+                    self.results.put(sorted(updated))
+                    updated = set()
+        if updated:
+            self.results.put(sorted(updated))
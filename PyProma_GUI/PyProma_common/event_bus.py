@@ -0,0 +1,125 @@
+import queue
+import sys
+import threading
+
+from PyProma_common.hook_registry import REFRESH, describe_trigger
+
+FILES_CHANGED = "files_changed"
+PACKAGES_CHANGED = "packages_changed"
+GIT_HEAD_CHANGED = "git_head_changed"
+SETTINGS_CHANGED = "settings_changed"
+EVENTS = {
+    FILES_CHANGED: (list,),
+    PACKAGES_CHANGED: (),
+    GIT_HEAD_CHANGED: (),
+    SETTINGS_CHANGED: (str,)}
+
+
+def check_event(event: str, args: tuple):
+    """this func checks that args match the payload of event.
+
+    Args:
+        event (str): name of event such as FILES_CHANGED
+        args (tuple): payload
+
+    Raises:
+        ValueError: event is unknown
+        TypeError: args don't match the payload
+    """
+    if (types := EVENTS.get(event)) is None:
+        raise ValueError(f"Unknown event '{event}'")
+    if len(args) != len(types) or not all(
+            isinstance(arg, type_) for arg, type_ in zip(args, types)):
+        expected = ", ".join(type_.__name__ for type_ in types)
+        raise TypeError(f"Event '{event}' takes ({expected})")
+
+
+class EventBus:
+    """this class delivers events to hooks subscribed to them.
+
+    subscribers are hooks of HookRegistry whose type is the name of an
+    event. a refresh method subscribed to an event is run like a normal
+    refresh (with its collect method) and gets no payload. other
+    subscribers are called with the payload.
+    events published from worker threads are queued and delivered by
+    a loop of the main thread, since tkinter must not be called from
+    other threads.
+
+    payloads:
+        FILES_CHANGED (list): absolute paths created, modified or deleted
+        PACKAGES_CHANGED: packages of the environment changed
+        GIT_HEAD_CHANGED: branch was switched or a commit was made
+        SETTINGS_CHANGED (str): name of changed setting
+    """
+    DELIVER_INTERVAL = 50
+
+    def __init__(self, main, hooks, run_refresh):
+        """this constructor binds the bus to a registry and starts the
+        loop delivering events of worker threads.
+        it must be called on the main thread.
+
+        Args:
+            main (tk.Misc): widget whose main loop delivers events
+            hooks (HookRegistry): registry of subscribers
+            run_refresh (callable): called with (owner, method, trigger)
+                for refresh methods
+        """
+        self.main = main
+        self.hooks = hooks
+        self.run_refresh = run_refresh
+        self.pending = queue.Queue()
+        self.main.after(self.DELIVER_INTERVAL, self.deliver)
+
+    def subscribe(
+            self, event: str, callback, priority: int = 0,
+            owner: str = None):
+        """this func subscribes a callback which is not a plugin method.
+
+        Args:
+            event (str): name of event
+            callback (callable): called with the payload
+            priority (int, optional): subscribers with lower priority are
+                called first. Defaults to 0.
+            owner (str, optional): name used by unregister().
+                Defaults to None.
+        """
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event '{event}'")
+        self.hooks.register(event, callback, priority, owner)
+
+    def publish(self, event: str, *args):
+        """this func delivers event to its subscribers.
+
+        Args:
+            event (str): name of event
+            *args: payload of event
+        """
+        check_event(event, args)
+        if threading.current_thread() is threading.main_thread():
+            self.dispatch(event, args)
+        else:
+            self.pending.put((event, args))
+
+    def deliver(self):
+        """this func dispatches events queued by worker threads.
+        this func calls itself on the main loop.
+        """
+        while True:
+            try:
+                event, args = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.dispatch(event, args)
+            except Exception:
+                self.main.report_callback_exception(*sys.exc_info())
+        self.main.after(self.DELIVER_INTERVAL, self.deliver)
+
+    def dispatch(self, event: str, args: tuple):
+        trigger = (describe_trigger(args[0]) if args else None) or event
+        for owner, callback in self.hooks.items(event):
+            if REFRESH in getattr(callback, "__hooks__", ()):
+                self.run_refresh(owner, callback, trigger)
+            else:
+                self.hooks.invoke(
+                    owner, event, callback, *args, trigger=trigger)
@@ -0,0 +1,341 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+
+CREATED = "created"
+DELETED = "deleted"
+MODIFIED = "modified"
+RESCAN = "rescan"
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def coalesce(events: list) -> dict:
+    """this func merges raw events into one change per path.
+
+    Args:
+        events (list): (kind, path) tuples in the order they happened
+
+    Returns:
+        dict: path -> kind. RESCAN is stored under the key "".
+    """
+    changes = {}
+    for kind, path in events:
+        if kind == RESCAN:
+            changes[""] = RESCAN
+            continue
+        previous = changes.get(path)
+        if previous is None:
+            changes[path] = kind
+        elif previous == CREATED and kind == DELETED:
+            del changes[path]
+        elif previous == DELETED and kind == CREATED:
+            changes[path] = MODIFIED
+        elif previous == CREATED and kind == MODIFIED:
+            continue
+        else:
+            changes[path] = kind
+    return changes
+
+
+class FileWatcher(ABC):
+    """this class is the base of watchers.
+    watchers run in a daemon thread and put (kind, path) into events.
+    """
+
+    def __init__(
+            self, root: str, dirs=(), ignore=None, shallow=(), tracked=()):
+        """this constructor sets root and directories to watch.
+
+        Args:
+            root (str): path to project directory
+            dirs (iterable, optional): directories to watch.
+                Defaults to () (only root).
+            ignore (IgnoreMatcher, optional): new directories which it
+                ignores are not watched. Defaults to None.
+            shallow (iterable, optional): directories in dirs whose new
+                subdirectories are not watched. Defaults to ().
+            tracked (iterable, optional): directories watched with all
+                their subdirectories even if ignore matches them (e.g.
+                .git/refs). Defaults to ().
+        """
+        self.root = os.path.normpath(root)
+        self.dirs = list(dirs) or [self.root]
+        self.ignore = ignore
+        self.shallow = set(shallow)
+        self.tracked = [os.path.normpath(path) for path in tracked]
+        self.events = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @abstractmethod
+    def run(self):
+        """this func watches until stop() is called. it runs in the
+        thread started by start().
+        """
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        if any(
+                path == tracked or path.startswith(tracked + os.sep)
+                for tracked in self.tracked):
+            return False
+        return self.ignore is not None and self.ignore.is_ignored(path, is_dir)
+
+    def get_changes(self) -> dict:
+        """this func takes every pending event and merges them.
+
+        Returns:
+            dict: path -> kind (see coalesce)
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return coalesce(events)
+
+
+class InotifyWatcher(FileWatcher):
+    """this class watches directories with Linux inotify.
+    if a watch can't be added (e.g. max_user_watches is exceeded), the
+    constructor raises OSError, and a running watcher puts RESCAN so that
+    it is replaced by create_watcher.
+    """
+
+    def __init__(
+            self, root: str, dirs=(), ignore=None, shallow=(), tracked=()):
+        super().__init__(root, dirs, ignore, shallow, tracked)
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        self._wds = {}
+        self.failed = False
+        try:
+            for path in self.dirs:
+                self._add_watch(path)
+            for path in self.tracked:
+                for directory, _, _ in os.walk(path):
+                    self._add_watch(directory)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self, path: str):
+        """this func watches a directory.
+        a directory which was removed or can't be read is skipped.
+
+        Raises:
+            OSError: watch can't be added for another reason
+        """
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._paths[wd] = path
+            self._wds[path] = wd
+            return
+        error = ctypes.get_errno()
+        if error not in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+            raise OSError(error, os.strerror(error), path)
+
+    def _add_watch_tree(self, path: str):
+        """this func watches path and its subdirectories and reports
+        entries which were created before the watch was added.
+        """
+        if self.is_ignored(path, True):
+            return
+        self._add_watch(path)
+        try:
+            with os.scandir(path) as entries:
+                entries = [(e.path, e.is_dir()) for e in entries]
+        except OSError:
+            return
+        for child, is_dir in entries:
+            self.events.put((CREATED, child))
+            if is_dir:
+                self._add_watch_tree(child)
+
+    def _forget_tree(self, path: str):
+        prefix = path + os.sep
+        for watched in list(self._wds):
+            if watched == path or watched.startswith(prefix):
+                wd = self._wds.pop(watched)
+                self._paths.pop(wd, None)
+                self.libc.inotify_rm_watch(self.fd, wd)
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([self.fd], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(self.fd, 65536)
+                except BlockingIOError:
+                    continue
+                self._parse(data)
+        finally:
+            os.close(self.fd)
+
+    def _parse(self, data: bytes):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.events.put((RESCAN, ""))
+                continue
+            if mask & IN_IGNORED:
+                if (path := self._paths.pop(wd, None)) is not None:
+                    self._wds.pop(path, None)
+                continue
+            if (directory := self._paths.get(wd)) is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.events.put((CREATED, path))
+                if (
+                        mask & IN_ISDIR and directory not in self.shallow
+                        and not self.failed):
+                    try:
+                        self._add_watch_tree(path)
+                    except OSError as e:
+                        sys.stderr.write(
+                            f"WARNING: Can't watch {path}: {e}\n")
+                        self.failed = True
+                        self.events.put((RESCAN, ""))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.events.put((DELETED, path))
+                if mask & IN_ISDIR:
+                    self._forget_tree(path)
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+                self.events.put((MODIFIED, path))
+
+
+class PollingWatcher(FileWatcher):
+    """this class compares stat snapshots of root periodically.
+    """
+
+    def __init__(
+            self, root: str, dirs=(), ignore=None, shallow=(), tracked=(),
+            interval: float = 2.0):
+        super().__init__(root, dirs, ignore, shallow, tracked)
+        self.interval = interval
+
+    def snapshot(self) -> dict:
+        """this func stats every entry under root.
+
+        Returns:
+            dict: path -> (is_dir, size, mtime)
+        """
+        result = {}
+        stack = [self.root, *self.shallow, *self.tracked]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        if directory in self.shallow:
+                            if not is_dir:
+                                result[entry.path] = (
+                                    is_dir, stat.st_size, stat.st_mtime)
+                            continue
+                        if self.is_ignored(entry.path, is_dir):
+                            continue
+                        result[entry.path] = (
+                            is_dir, stat.st_size, stat.st_mtime)
+                        if is_dir:
+                            stack.append(entry.path)
+            except OSError:
+                continue
+        return result
+
+    def run(self):
+        previous = self.snapshot()
+        while not self._stop_event.wait(self.interval):
+            start_time = time.monotonic()
+            current = self.snapshot()
+            for path in previous.keys() - current.keys():
+                self.events.put((DELETED, path))
+            for path in current.keys() - previous.keys():
+                self.events.put((CREATED, path))
+            for path in current.keys() & previous.keys():
+                if (
+                        current[path] != previous[path]
+                        and not current[path][0]):
+                    self.events.put((MODIFIED, path))
+            previous = current
+            self.interval = max(
+                self.interval, (time.monotonic() - start_time) * 4)
+
+
+def create_watcher(
+        root: str, dirs=(), ignore=None, shallow=(),
+        tracked=()) -> FileWatcher:
+    """this func makes inotify watcher on Linux and polling watcher on
+    other platforms or when inotify is not available.
+
+    Args:
+        root (str): path to project directory
+        dirs (iterable, optional): directories to watch.
+            Defaults to () (only root).
+        ignore (IgnoreMatcher, optional): new directories which it
+            ignores are not watched. Defaults to None.
+        shallow (iterable, optional): directories whose new
+            subdirectories are not watched. Defaults to ().
+        tracked (iterable, optional): directories watched with all their
+            subdirectories even if ignore matches them. Defaults to ().
+
+    Returns:
+        FileWatcher: watcher (not started yet)
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(
+                root, [*dirs, *shallow], ignore, shallow, tracked)
+        except AttributeError:
+            pass
+        except OSError as e:
+            sys.stderr.write(
+                f"WARNING: inotify is not usable ({e}), polling instead\n")
+    return PollingWatcher(root, dirs, ignore, shallow, tracked)
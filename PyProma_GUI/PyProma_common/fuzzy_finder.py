@@ -0,0 +1,130 @@
+import re
+from bisect import bisect_right
+
+
+class FuzzyFinder:
+    """this class finds paths by fuzzy query.
+
+    lowercased paths and basenames are kept in two texts where every
+    line starts with a newline, so each search is a few str.find and
+    regex scans in C instead of a Python loop over every path.
+    added paths are joined to the texts on the next search.
+    results are ranked in tiers: basename prefix, basename substring,
+    path substring and fuzzy path. each tier stops scanning once limit
+    paths are found, and shorter paths come first in each tier.
+    removed paths are skipped until more than half of the lines are
+    removed, then the texts are rebuilt.
+    """
+
+    def __init__(self, paths=()):
+        self.clear()
+        for path in paths:
+            self.add(path)
+
+    def clear(self):
+        self._paths = []
+        self._lines = {}
+        self._removed = set()
+        self._texts = ["", ""]
+        self._pending = ([], [])
+        self._offsets = ([], [])
+        self._sizes = [0, 0]
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._lines
+
+    def add(self, path: str):
+        """this func adds path to the texts.
+
+        Args:
+            path (str): path shown in results
+        """
+        if path in self._lines:
+            return
+        lowered = path.replace("\\", "/").lower()
+        name = lowered.rpartition("/")[2]
+        self._lines[path] = len(self._paths)
+        self._paths.append(path)
+        for i, line in enumerate((lowered, name)):
+            self._offsets[i].append(self._sizes[i])
+            self._pending[i].append("\n" + line)
+            self._sizes[i] += len(line) + 1
+
+    def remove(self, path: str):
+        """this func removes path from results.
+
+        Args:
+            path (str): path given to add
+        """
+        if (line := self._lines.pop(path, None)) is None:
+            return
+        self._removed.add(line)
+        if len(self._removed) * 2 > len(self._paths):
+            paths = list(self._lines)
+            self.clear()
+            for path in paths:
+                self.add(path)
+
+    def _find(self, text: int, needle: str, found: dict, limit: int):
+        """this func collects lines of texts[text] containing needle.
+        """
+        text, offsets = self._texts[text], self._offsets[text]
+        start = 0
+        while len(found) < limit:
+            if (pos := text.find(needle, start)) == -1:
+                return
+            line = bisect_right(offsets, pos) - 1
+            if line not in self._removed:
+                found.setdefault(line)
+            start = (
+                offsets[line + 1] if line + 1 < len(offsets) else len(text))
+
+    def _fuzzy(self, query: str, found: dict, limit: int):
+        """this func collects lines in which characters of query appear
+        in order.
+        """
+        pattern = re.escape(query[0]) + "".join(
+            f"[^\\n{re.escape(c)}]*{re.escape(c)}" for c in query[1:])
+        offsets = self._offsets[0]
+        for match in re.finditer(pattern, self._texts[0]):
+            line = bisect_right(offsets, match.start()) - 1
+            if line not in self._removed:
+                found.setdefault(line)
+                if len(found) >= limit:
+                    return
+
+    def search(self, query: str, limit: int = 50) -> list:
+        """this func finds paths matching query.
+
+        Args:
+            query (str): characters which appear in order in the path
+            limit (int, optional): max number of results. Defaults to 50.
+
+        Returns:
+            list: matched paths, best first
+        """
+        query = "".join(query.replace("\\", "/").lower().split())
+        if not query:
+            return []
+        for i, pending in enumerate(self._pending):
+            if pending:
+                self._texts[i] += "".join(pending)
+                pending.clear()
+        results = {}
+        tiers = (
+            lambda found: self._find(1, "\n" + query, found, limit),
+            lambda found: self._find(1, query, found, limit),
+            lambda found: self._find(0, query, found, limit),
+            lambda found: self._fuzzy(query, found, limit))
+        for tier in tiers:
+            found = dict.fromkeys(results)
+            tier(found)
+            new_lines = [line for line in found if line not in results]
+            new_lines.sort(key=lambda line: len(self._paths[line]))
+            results.update(dict.fromkeys(new_lines))
+            if len(results) >= limit:
+                break
+        return [self._paths[line] for line in list(results)[:limit]]
@@ -0,0 +1,113 @@
+import json
+import math
+import threading
+from collections import deque
+
+
+class HookProfiler:
+    """this class records wall time of hook calls.
+
+    calls are grouped by (owner, hook type, method name). count and
+    total are exact, and percentiles are computed from the last SAMPLES
+    calls. the file which triggered the slowest and the last call is
+    kept. record can be called from worker threads.
+    """
+    SAMPLES = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def record(
+            self, owner: str, hook_type: str, name: str,
+            seconds: float, trigger: str = None):
+        """this func adds one call.
+
+        Args:
+            owner (str): name of plugin
+            hook_type (str): type of hook such as REFRESH
+            name (str): name of method
+            seconds (float): wall time of call
+            trigger (str, optional): file which triggered the call.
+                Defaults to None.
+        """
+        with self._lock:
+            if (stat := self._stats.get((owner, hook_type, name))) is None:
+                stat = {
+                    "count": 0, "total": 0., "max": 0.,
+                    "samples": deque(maxlen=self.SAMPLES),
+                    "slowest_trigger": None, "last_trigger": None}
+                self._stats[(owner, hook_type, name)] = stat
+            stat["count"] += 1
+            stat["total"] += seconds
+            stat["samples"].append(seconds)
+            stat["last_trigger"] = trigger
+            if seconds >= stat["max"]:
+                stat["max"] = seconds
+                stat["slowest_trigger"] = trigger
+
+    @staticmethod
+    def percentile(samples: list, q: float) -> float:
+        """this func finds nearest-rank percentile.
+
+        Args:
+            samples (list): sorted values
+            q (float): 0 to 1
+
+        Returns:
+            float: percentile (0 if samples is empty)
+        """
+        if not samples:
+            return 0.
+        return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+    def summary(self) -> list:
+        """this func summarizes calls, slowest total first.
+
+        Returns:
+            list: dicts of owner, hook, method, count, total, p50, p95,
+                max (seconds), slowest_trigger and last_trigger
+        """
+        with self._lock:
+            items = [
+                (key, dict(stat, samples=sorted(stat["samples"])))
+                for key, stat in self._stats.items()]
+        rows = []
+        for (owner, hook_type, name), stat in items:
+            rows.append({
+                "owner": owner,
+                "hook": hook_type,
+                "method": name,
+                "count": stat["count"],
+                "total": stat["total"],
+                "p50": self.percentile(stat["samples"], 0.5),
+                "p95": self.percentile(stat["samples"], 0.95),
+                "max": stat["max"],
+                "slowest_trigger": stat["slowest_trigger"],
+                "last_trigger": stat["last_trigger"]})
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows
+
+    def export(self, path: str):
+        """this func writes summary to a JSON file.
+
+        Args:
+            path (str): path to JSON file
+        """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=4)
+
+    def print_summary(self):
+        print(
+            f"{'plugin':<12} {'hook':<14} {'method':<24} {'count':>6} "
+            f"{'total ms':>9} {'p50 ms':>8} {'p95 ms':>8}  slowest file")
+        for row in self.summary():
+            print(
+                f"{str(row['owner']):<12} {row['hook']:<14} "
+                f"{row['method']:<24} {row['count']:>6} "
+                f"{row['total'] * 1000:>9.1f} {row['p50'] * 1000:>8.2f} "
+                f"{row['p95'] * 1000:>8.2f}  {row['slowest_trigger'] or ''}")
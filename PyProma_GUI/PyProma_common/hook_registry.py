@@ -0,0 +1,237 @@
+import time
+from bisect import insort
+from functools import wraps
+
+REFRESH = "refresh"
+COLLECT = "collect"
+PYFILE = "pyfile"
+PYFILES = "pyfiles"
+PYFILE_REMOVED = "pyfile_removed"
+
+
+def hook_method(hook_type: str, priority: int = 0):
+    """this func makes a decorator which marks a method as a hook.
+    marked methods are found by HookRegistry.register_plugin.
+
+    Args:
+        hook_type (str): type of hook such as REFRESH
+        priority (int, optional): hooks with lower priority are called
+            first. Defaults to 0.
+
+    Returns:
+        callable: decorator
+    """
+    def decorator(method):
+        hooks = dict(getattr(method, "__hooks__", {}))
+        hooks[hook_type] = priority
+        method.__hooks__ = hooks
+        return method
+    return decorator
+
+
+def each_path(
+        method, registry=None, owner: str = None, hook_type: str = None):
+    """this func adapts a hook taking one path to a hook taking a list
+    of paths.
+    with registry, each call is made by registry.invoke, so the profiler
+    records one sample per path instead of one per list.
+
+    Args:
+        method (callable): hook called with one path
+        registry (HookRegistry, optional): registry which times each
+            call. Defaults to None.
+        owner (str, optional): name of plugin. Defaults to None.
+        hook_type (str, optional): type recorded for each call.
+            Defaults to None.
+
+    Returns:
+        callable: hook called with a list of paths
+    """
+    @wraps(method)
+    def batch(paths):
+        for path in paths:
+            if registry is None:
+                method(path)
+            else:
+                registry.invoke(owner, hook_type, method, path)
+    batch.__profiled__ = registry is not None
+    return batch
+
+
+class HookRegistry:
+    """this class keeps hooks of plugins sorted by priority.
+
+    hooks are collected from plugin classes once when a plugin is
+    registered, so dispatch is iteration over a prepared list.
+    hooks of the same priority are called in registration order, and
+    methods of one plugin in definition order.
+    if profiler is set, every call is timed and recorded with the file
+    which triggered it.
+    """
+
+    def __init__(self, profiler=None):
+        """this constructor makes an empty registry.
+
+        Args:
+            profiler (HookProfiler, optional): recorder of calls.
+                Defaults to None (calls are not timed).
+        """
+        self.profiler = profiler
+        self._entries = {}
+        self._callbacks = {}
+        self._items = {}
+        self._sequence = 0
+
+    def register(
+            self, hook_type: str, callback, priority: int = 0,
+            owner: str = None):
+        """this func adds a hook.
+
+        Args:
+            hook_type (str): type of hook such as REFRESH
+            callback (callable): function called by call()
+            priority (int, optional): hooks with lower priority are
+                called first. Defaults to 0.
+            owner (str, optional): name used by unregister().
+                Defaults to None.
+        """
+        entries = self._entries.setdefault(hook_type, [])
+        insort(entries, (priority, self._sequence, owner, callback))
+        self._sequence += 1
+        self._update(hook_type)
+
+    def _update(self, hook_type: str):
+        entries = self._entries[hook_type]
+        self._callbacks[hook_type] = [entry[3] for entry in entries]
+        self._items[hook_type] = [(entry[2], entry[3]) for entry in entries]
+
+    def register_plugin(self, owner: str, plugin, adapters=None):
+        """this func adds every method of plugin marked by hook_method.
+
+        Args:
+            owner (str): name of plugin
+            plugin (object): tab or menu instance
+            adapters (dict, optional): hook type -> (hook type, adapter).
+                hooks of the key type are wrapped by adapter (called with
+                (callback, registry, owner, hook type)) and registered as
+                the other type, with the same priority. Defaults to None.
+        """
+        adapters = adapters or {}
+        methods = {}
+        for klass in reversed(type(plugin).__mro__):
+            for name, value in vars(klass).items():
+                if hasattr(value, "__hooks__"):
+                    methods[name] = value.__hooks__
+                elif name in methods:
+                    del methods[name]
+        for name, hooks in methods.items():
+            for hook_type, priority in hooks.items():
+                callback = getattr(plugin, name)
+                if hook_type in adapters:
+                    adapted_type, adapter = adapters[hook_type]
+                    callback = adapter(callback, self, owner, hook_type)
+                    hook_type = adapted_type
+                self.register(hook_type, callback, priority, owner)
+
+    def unregister(self, owner: str):
+        """this func removes every hook of owner.
+
+        Args:
+            owner (str): name given to register()
+        """
+        for hook_type, entries in self._entries.items():
+            entries[:] = [entry for entry in entries if entry[2] != owner]
+            self._update(hook_type)
+
+    def hooks(self, hook_type: str, owner: str = None) -> list:
+        """this func lists hooks of hook_type in call order.
+
+        Args:
+            hook_type (str): type of hook
+            owner (str, optional): only hooks of owner.
+                Defaults to None (all hooks).
+
+        Returns:
+            list: callbacks
+        """
+        if owner is None:
+            return self._callbacks.get(hook_type, [])
+        return [
+            entry[3] for entry in self._entries.get(hook_type, [])
+            if entry[2] == owner]
+
+    def items(self, hook_type: str) -> list:
+        """this func lists (owner, callback) of hook_type in call order.
+
+        Args:
+            hook_type (str): type of hook
+
+        Returns:
+            list: (owner, callback)
+        """
+        return self._items.get(hook_type, [])
+
+    def invoke(
+            self, owner: str, hook_type: str, callback, *args,
+            trigger: str = None):
+        """this func calls one hook and records its time if profiler is
+        set. hooks which record their own calls (see each_path) are not
+        recorded again.
+
+        Args:
+            owner (str): name of plugin
+            hook_type (str): type of hook
+            callback (callable): hook
+            *args: arguments passed to hook
+            trigger (str, optional): file which triggered the call.
+                Defaults to None (the path in args if any).
+
+        Returns:
+            object: result of callback
+        """
+        if self.profiler is None or getattr(
+                callback, "__profiled__", False):
+            return callback(*args)
+        if trigger is None and args:
+            trigger = describe_trigger(args[0])
+        start_time = time.perf_counter()
+        try:
+            return callback(*args)
+        finally:
+            self.profiler.record(
+                owner, hook_type, getattr(callback, "__name__", "?"),
+                time.perf_counter() - start_time, trigger)
+
+    def call(self, hook_type: str, *args, trigger: str = None):
+        """this func calls every hook of hook_type with args.
+
+        Args:
+            hook_type (str): type of hook
+            *args: arguments passed to hooks
+            trigger (str, optional): file which triggered the call.
+                Defaults to None (the path in args if any).
+        """
+        if self.profiler is None:
+            for callback in self.hooks(hook_type):
+                callback(*args)
+            return
+        for owner, callback in self.items(hook_type):
+            self.invoke(owner, hook_type, callback, *args, trigger=trigger)
+
+
+def describe_trigger(value) -> str | None:
+    """this func makes trigger text from the first argument of a hook.
+
+    Args:
+        value (object): path or list of paths
+
+    Returns:
+        str | None: path, "path (+n more)" or None
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and value and isinstance(value[0], str):
+        if len(value) == 1:
+            return value[0]
+        return f"{value[0]} (+{len(value) - 1} more)"
+    return None
@@ -0,0 +1,210 @@
+import json
+import os
+import re
+
+json_path = "PyProma_settings.json"
+
+DEFAULT_EXCLUDES = [
+    ".git/", "__pycache__/", ".venv/", "venv/", "node_modules/"]
+
+
+def compile_pattern(pattern: str) -> tuple | None:
+    """this func compiles one gitignore pattern.
+
+    Args:
+        pattern (str): line of .gitignore
+
+    Returns:
+        tuple | None: (regex, negate, dir_only) or None for blank lines
+            and comments
+    """
+    pattern = pattern.rstrip("\n")
+    if not pattern.strip() or pattern.startswith("#"):
+        return None
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip()
+    negate = pattern.startswith("!")
+    if negate or pattern.startswith("\\!") or pattern.startswith("\\#"):
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = ("" if anchored else "(?:.*/)?") + _translate(pattern)
+    return re.compile(regex, re.DOTALL), negate, dir_only
+
+
+def _translate(pattern: str) -> str:
+    i, n = 0, len(pattern)
+    result = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            result.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            result.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            result.append("[^/]*")
+        elif c == "?":
+            result.append("[^/]")
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            result.append(re.escape(pattern[i]))
+        elif c == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            result.append(f"[{body}]")
+            i = end
+        else:
+            result.append(re.escape(c))
+        i += 1
+    return "".join(result)
+
+
+def parse_patterns(lines) -> list:
+    """this func compiles gitignore lines and drops blanks and comments.
+
+    Args:
+        lines (iterable): lines of .gitignore
+
+    Returns:
+        list: compiled rules
+    """
+    return [rule for line in lines if (rule := compile_pattern(line))]
+
+
+def read_patterns(path: str) -> list:
+    """this func reads and compiles an ignore file.
+
+    Args:
+        path (str): path to .gitignore or .git/info/exclude
+
+    Returns:
+        list: compiled rules (empty if file can't be read)
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return parse_patterns(f)
+    except OSError:
+        return []
+
+
+def load_project_excludes(dir_path: str) -> list:
+    """this func reads exclude patterns of dir_path in settings.
+
+    Args:
+        dir_path (str): path to project directory
+
+    Returns:
+        list: exclude patterns
+    """
+    try:
+        with open(json_path) as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return settings.get("excludes", {}).get(dir_path, [])
+
+
+def save_project_excludes(dir_path: str, excludes: list):
+    """this func writes exclude patterns of dir_path to settings.
+
+    Args:
+        dir_path (str): path to project directory
+        excludes (list): exclude patterns
+    """
+    try:
+        with open(json_path) as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        settings = {}
+    settings.setdefault("excludes", {})[dir_path] = excludes
+    with open(json_path, "w") as f:
+        json.dump(settings, f, indent=4)
+
+
+class IgnoreMatcher:
+    """this class decides whether a path under root is ignored.
+
+    rules are checked in this order and the last matching rule wins:
+    DEFAULT_EXCLUDES, .git/info/exclude, .gitignore files from root to
+    the directory of the path, and the project excludes in settings.
+    """
+
+    def __init__(self, root: str, excludes=(), defaults=DEFAULT_EXCLUDES):
+        """this constructor compiles rules which don't depend on the path.
+
+        Args:
+            root (str): path to project directory
+            excludes (iterable, optional): project exclude patterns.
+                Defaults to ().
+            defaults (iterable, optional): default exclude patterns.
+                Defaults to DEFAULT_EXCLUDES.
+        """
+        self.root = os.path.normpath(root)
+        self._prefix = os.path.join(self.root, "")
+        self.base_rules = parse_patterns(defaults) + read_patterns(
+            os.path.join(self.root, ".git", "info", "exclude"))
+        self.project_rules = parse_patterns(excludes)
+        self._gitignores = {}
+        self._groups = {}
+
+    def _gitignore(self, directory: str) -> list:
+        if (rules := self._gitignores.get(directory)) is None:
+            rules = read_patterns(
+                os.path.join(self.root, directory, ".gitignore"))
+            self._gitignores[directory] = rules
+        return rules
+
+    def _rule_groups(self, directory: str) -> list:
+        """this func lists (base, rules) which apply to entries in
+        directory, from the lowest to the highest precedence.
+        """
+        if (groups := self._groups.get(directory)) is None:
+            if directory:
+                parent = directory.rpartition("/")[0]
+                groups = self._rule_groups(parent)[:-1]
+                base = directory + "/"
+            else:
+                groups = [("", self.base_rules)]
+                base = ""
+            if rules := self._gitignore(directory):
+                groups.append((base, rules))
+            groups.append(("", self.project_rules))
+            self._groups[directory] = groups
+        return groups
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """this func checks path against rules.
+        ancestors of path are not checked, so call this while walking.
+
+        Args:
+            path (str): absolute path or path relative to root
+            is_dir (bool, optional): path is a directory. Defaults to False.
+
+        Returns:
+            bool: True if path is ignored
+        """
+        if path.startswith(self._prefix):
+            relpath = path[len(self._prefix):]
+        elif os.path.isabs(path):
+            relpath = os.path.relpath(path, self.root)
+        else:
+            relpath = os.path.normpath(path)
+        relpath = relpath.replace(os.sep, "/")
+        if relpath == "." or relpath.startswith("../"):
+            return False
+        directory = relpath.rpartition("/")[0]
+        for base, rules in reversed(self._rule_groups(directory)):
+            target = relpath[len(base):]
+            for regex, negate, dir_only in reversed(rules):
+                if (not dir_only or is_dir) and regex.fullmatch(target):
+                    return not negate
+        return False
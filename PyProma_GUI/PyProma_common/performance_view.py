@@ -0,0 +1,90 @@
+import tkinter as tk
+import tkinter.ttk as ttk
+from tkinter import filedialog, messagebox
+
+from PyProma_common.PyProma_templates import tab_template
+
+COLUMNS = (
+    ("owner", "Plugin", 90), ("hook", "Hook", 80), ("method", "Method", 130),
+    ("count", "Count", 55), ("total", "Total ms", 70),
+    ("p50", "p50 ms", 60), ("p95", "p95 ms", 60), ("max", "Max ms", 60),
+    ("slowest_trigger", "Slowest file", 180))
+TIME_COLUMNS = ("total", "p50", "p95", "max")
+
+
+class PerformanceView(tab_template.TabTemplate):
+    """this class shows time of hook calls recorded by the profiler of
+    main.hooks. it is updated every UPDATE_INTERVAL ms while shown.
+    """
+    UPDATE_INTERVAL = 1000
+
+    def __init__(self, master=None, main=None):
+        super().__init__(master, main)
+        self.button_frame = tk.Frame(self)
+        tk.Button(
+            self.button_frame, text="Refresh", command=self.update_table
+            ).pack(side=tk.LEFT, padx=3)
+        tk.Button(
+            self.button_frame, text="Reset", command=self.reset
+            ).pack(side=tk.LEFT, padx=3)
+        tk.Button(
+            self.button_frame, text="Export JSON", command=self.export
+            ).pack(side=tk.LEFT, padx=3)
+        self.button_frame.pack(fill=tk.X, pady=3)
+        self.table = ttk.Treeview(
+            self, show="headings", columns=[column[0] for column in COLUMNS])
+        for name, text, width in COLUMNS:
+            self.table.heading(name, text=text)
+            self.table.column(
+                name, width=width,
+                anchor=tk.W if name in (
+                    "owner", "hook", "method", "slowest_trigger") else tk.E)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.after_id = None
+        self.bind("<Map>", self.on_map)
+        self.bind("<Unmap>", self.on_unmap)
+
+    @property
+    def profiler(self):
+        return getattr(self.main.hooks, "profiler", None)
+
+    def on_map(self, _: tk.Event = None):
+        if self.after_id is None:
+            self.update_table()
+
+    def on_unmap(self, _: tk.Event = None):
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+
+    def update_table(self):
+        """this func shows summary of the profiler.
+        this func calls itself while the tab is shown.
+        """
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+        self.table.delete(*self.table.get_children())
+        if self.profiler is not None:
+            for row in self.profiler.summary():
+                self.table.insert("", tk.END, values=[
+                    f"{row[name] * 1000:.2f}" if name in TIME_COLUMNS
+                    else row[name] or ""
+                    for name, _, _ in COLUMNS])
+        self.after_id = self.after(self.UPDATE_INTERVAL, self.update_table)
+
+    def reset(self):
+        if self.profiler is not None:
+            self.profiler.reset()
+        self.update_table()
+
+    def export(self):
+        if self.profiler is None:
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json", initialfile="hook_profile.json",
+            filetypes=[("JSON", "*.json")])
+        if path:
+            try:
+                self.profiler.export(path)
+            except OSError as e:
+                messagebox.showerror(title="OSError", message=str(e))
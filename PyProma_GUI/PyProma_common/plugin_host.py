@@ -0,0 +1,271 @@
+import importlib.util
+import os
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from PyProma_common.cancellation import (
+    CancelToken, Cancelled, set_current_token)
+
+CALL = "call"
+CANCEL = "cancel"
+RESULT = "result"
+ERROR = "error"
+DONE = "done"
+EXITED = "exited"
+HOST = "host"
+HEADER = struct.Struct("<I")
+GUI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# imported plugin modules of a worker of a process pool
+_modules = {}
+
+
+def write_message(stream, message: tuple):
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_message(stream) -> tuple | None:
+    """this func reads one message.
+
+    Args:
+        stream (BinaryIO): pipe
+
+    Returns:
+        tuple | None: message or None at end of stream
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    size, = HEADER.unpack(header)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return pickle.loads(data)
+
+
+def load_function(module_path: str, function_name: str, modules: dict):
+    """this func imports a plugin module once and gets its function.
+
+    Args:
+        module_path (str): path to *_plugin.py
+        function_name (str): name of module-level function
+        modules (dict): module_path -> imported module
+
+    Returns:
+        callable: function
+    """
+    if module_path not in modules:
+        module_name = os.path.basename(module_path)[:-3]
+        spec = importlib.util.spec_from_file_location(
+            module_name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules[module_path] = module
+    return getattr(modules[module_path], function_name)
+
+
+def run_paths(function, paths: list, args: tuple = (), token=None):
+    """this func calls function with each path and makes messages of the
+    results without job id.
+
+    Args:
+        function (callable): called with (path, *args)
+        paths (list): paths to files
+        args (tuple, optional): extra arguments. Defaults to ().
+        token (CancelToken, optional): stops when it is cancelled.
+            Defaults to None.
+
+    Yields:
+        tuple: (RESULT, path, value, seconds) or (ERROR, path, traceback)
+    """
+    for path in paths:
+        if token is not None and token.cancelled:
+            return
+        start_time = time.perf_counter()
+        try:
+            value = function(path, *args)
+        except Cancelled:
+            return
+        except Exception:
+            yield (ERROR, path, traceback.format_exc())
+        else:
+            yield (RESULT, path, value, time.perf_counter() - start_time)
+
+
+def run_chunk(
+        module_path: str, function_name: str, paths: list,
+        args: tuple = ()) -> list:
+    """this func runs a chunk of a batch in a worker of a process pool.
+    modules are imported once per worker.
+
+    Args:
+        module_path (str): path to *_plugin.py
+        function_name (str): name of module-level function
+        paths (list): paths to files
+        args (tuple, optional): extra arguments. Defaults to ().
+
+    Returns:
+        list: messages made by run_paths
+    """
+    try:
+        function = load_function(module_path, function_name, _modules)
+    except Exception:
+        return [(ERROR, None, traceback.format_exc())]
+    return list(run_paths(function, paths, args))
+
+
+def serve(stdin, stdout):
+    """this func runs jobs sent to stdin one by one and streams results
+    to stdout, until stdin is closed.
+    CANCEL cancels the token of a job, which kills commands started by
+    run_command of PyProma_common.cancellation.
+
+    Args:
+        stdin (BinaryIO): pipe from GUI
+        stdout (BinaryIO): pipe to GUI
+    """
+    jobs = queue.Queue()
+    tokens = {}
+
+    def read_jobs():
+        while (message := read_message(stdin)) is not None:
+            if message[0] == CANCEL:
+                tokens.setdefault(message[1], CancelToken()).cancel()
+            elif message[0] == CALL:
+                jobs.put(message)
+        jobs.put(None)
+
+    threading.Thread(target=read_jobs, daemon=True).start()
+    modules = {}
+    while (message := jobs.get()) is not None:
+        _, job, module_path, function_name, paths, args = message
+        token = tokens.setdefault(job, CancelToken())
+        set_current_token(token)
+        try:
+            function = load_function(module_path, function_name, modules)
+        except Exception:
+            write_message(stdout, (ERROR, job, None, traceback.format_exc()))
+        else:
+            for kind, *result in run_paths(function, paths, args, token):
+                write_message(stdout, (kind, job, *result))
+        set_current_token(None)
+        del tokens[job]
+        write_message(stdout, (DONE, job))
+
+
+class PluginHost:
+    """this class starts the host process and exchanges messages with
+    it. the host runs module-level functions of plugins for batches of
+    files, so that heavy work doesn't hold the GIL of the GUI process
+    and a crash doesn't close the window.
+
+    messages are pickled tuples prefixed by their length, sent over
+    stdin (to host) and stdout (from host):
+        (CALL, job, module_path, function_name, paths, args)
+        (CANCEL, job)
+        (RESULT, job, path, value, seconds)
+        (ERROR, job, path, traceback)
+        (DONE, job)
+    messages from the host are put into messages by a reader thread,
+    and (EXITED, jobs) with unfinished jobs when the host ends.
+    the process is started on the first submit and again after it ends.
+    """
+
+    def __init__(self, messages: queue.Queue):
+        """this constructor prepares the host without starting it.
+
+        Args:
+            messages (queue.Queue): queue receiving messages from host
+        """
+        self.messages = messages
+        self.process = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [GUI_DIR, env.get("PYTHONPATH")]))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "PyProma_common.plugin_host"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            cwd=GUI_DIR, env=env)
+        self._jobs[self.process.pid] = set()
+        threading.Thread(
+            target=self._read, args=(self.process,), daemon=True).start()
+
+    def _read(self, process: subprocess.Popen):
+        jobs = self._jobs[process.pid]
+        while (message := read_message(process.stdout)) is not None:
+            if message[0] == DONE:
+                with self._lock:
+                    jobs.discard(message[1])
+            self.messages.put(message)
+        process.wait()
+        with self._lock:
+            unfinished = sorted(self._jobs.pop(process.pid))
+        self.messages.put((EXITED, unfinished))
+
+    def submit(
+            self, job: int, module_path: str, function_name: str,
+            paths: list, args: tuple = ()):
+        """this func sends a job to the host.
+
+        Args:
+            job (int): id of job
+            module_path (str): path to *_plugin.py
+            function_name (str): module-level function called with each
+                path (and args) in the host
+            paths (list): paths to files
+            args (tuple, optional): extra arguments passed after path.
+                Defaults to ().
+        """
+        self._send(
+            (CALL, job, module_path, function_name, paths, args), job)
+
+    def cancel(self, job: int):
+        if self.running:
+            self._send((CANCEL, job))
+
+    def _send(self, message: tuple, job: int = None):
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            if job is not None:
+                self._jobs[self.process.pid].add(job)
+            try:
+                write_message(self.process.stdin, message)
+            except OSError:
+                self.process.kill()
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        """this func closes stdin of the host and kills it if it doesn't
+        exit soon.
+        """
+        with self._lock:
+            if self.process is None:
+                return
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+            self.process = None
+
+
+if __name__ == "__main__":
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    serve(sys.stdin.buffer, protocol_out)
@@ -0,0 +1,617 @@
+import ast
+import importlib.util
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+import tkinter as tk
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, as_completed)
+from textwrap import dedent
+from tkinter import messagebox
+
+import inflection
+import yaml
+from PyProma_common.cancellation import (
+    CancelToken, Cancelled, set_current_token)
+from PyProma_common.event_bus import EventBus
+from PyProma_common.hook_profiler import HookProfiler
+from PyProma_common.hook_registry import COLLECT, REFRESH, HookRegistry
+from PyProma_common.plugin_host import (
+    CANCEL, DONE, ERROR, EXITED, HOST, RESULT, PluginHost, run_chunk)
+from PyProma_common.PyProma_templates import tab_template
+
+# imported plugin modules shared by every loader (path -> module)
+MODULES = {}
+
+
+def read_plugin_info(path: str) -> dict:
+    """this func reads metadata and class names of a plugin module with
+    ast, without executing it.
+
+    Args:
+        path (str): path to *_plugin.py
+
+    Returns:
+        dict: "metadata" (YAML docstring or {}), "tab" and "menu"
+            ((class name, display name) or None)
+    """
+    module_name = os.path.basename(path)[:-3]
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    try:
+        metadata = yaml.safe_load(ast.get_docstring(tree) or "") or {}
+    except yaml.YAMLError:
+        metadata = {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    info = {"metadata": metadata, "tab": None, "menu": None}
+    classes = {
+        node.name: node for node in tree.body
+        if isinstance(node, ast.ClassDef)}
+    for kind in ("tab", "menu"):
+        class_name = inflection.camelize(module_name[:-7]) + kind.title()
+        if (node := classes.get(class_name)) is None:
+            continue
+        display_name = class_name
+        for statement in node.body:
+            if (
+                    isinstance(statement, ast.Assign)
+                    and any(
+                        isinstance(target, ast.Name) and target.id == "NAME"
+                        for target in statement.targets)
+                    and isinstance(statement.value, ast.Constant)):
+                display_name = statement.value.value
+        info[kind] = (class_name, display_name)
+    return info
+
+
+class PluginLoader:
+    """this class adds placeholders for tabs and menus of plugins and
+    loads a plugin only when its tab is selected or its menu is opened.
+
+    refresh methods with a collect method run it first and get its
+    result. if metadata of the plugin has "refresh: concurrent", the
+    collect method runs in a thread pool and the refresh method is
+    called on the main loop when it is done.
+    every hook call is recorded by profiler. plugins publish events
+    with publish() and subscribe to them with hooks (see EventBus).
+    run_batch() runs a function of a plugin for many files in the
+    thread pool, in a host process if metadata of the plugin has
+    "host: process", or in chunks in a process pool if it has
+    "host: pool".
+    refresh_plugins() starts a new generation. tokens of the previous
+    generation are cancelled, and their batches and collect results
+    which arrive later are dropped.
+
+    subclasses set PLUGIN_DIR to the directory of *_plugin.py files.
+    """
+    PLUGIN_DIR = ""
+    REFRESH_WORKERS = 4
+    REFRESH_INTERVAL = 20
+    BATCH_MESSAGES = 500
+    POOL_CHUNK = 64
+
+    def __init__(self, main):
+        """this constructor reads plugins and adds placeholders.
+
+        Args:
+            main (tk.Tk): window which has tab (ttk.Notebook) and
+                main_menu (tk.Menu)
+        """
+        self.tabs = {}
+        self.menus = {}
+        self.main = main
+        self.profiler = HookProfiler()
+        self.hooks = HookRegistry(self.profiler)
+        self.events = EventBus(main, self.hooks, self.run_refresh)
+        self.modules = {}
+        self.placeholders = {}
+        self.metadata = {}
+        self.tab_modules = {}
+        self.executor = ThreadPoolExecutor(self.REFRESH_WORKERS)
+        self.pending_refreshes = {}
+        self.batch_messages = queue.Queue()
+        self.batch_jobs = {}
+        self.batch_ids = itertools.count(1)
+        self.host = PluginHost(self.batch_messages)
+        self.pool = None
+        self.pool_futures = {}
+        self.generation = 0
+        self.tokens = {}
+        main.tab.bind(
+            "<<NotebookTabChanged>>", self.tab_on_changed, add="+")
+        for filename in sorted(os.listdir(self.PLUGIN_DIR)):
+            if filename.endswith("_plugin.py"):
+                path = os.path.join(self.PLUGIN_DIR, filename)
+                try:
+                    info = read_plugin_info(path)
+                except (OSError, SyntaxError, ValueError) as e:
+                    messagebox.showerror(
+                        title="Error", message=f"Can't read {filename}: {e}")
+                    continue
+                self.metadata[filename[:-3]] = info["metadata"]
+                if info["tab"] is not None:
+                    self.add_placeholder_tab(filename[:-3], *info["tab"])
+                if info["menu"] is not None:
+                    self.add_placeholder_menu(filename[:-3], *info["menu"])
+
+    def load_module(self, module_name: str):
+        """this func imports a plugin module once per process.
+
+        Args:
+            module_name (str): file name of plugin without .py
+
+        Returns:
+            module | None: module or None if it can't be imported
+        """
+        if module_name not in self.modules:
+            path = os.path.abspath(
+                os.path.join(self.PLUGIN_DIR, module_name + ".py"))
+            if path not in MODULES:
+                spec = importlib.util.spec_from_file_location(
+                    module_name, path)
+                module = importlib.util.module_from_spec(spec)
+                try:
+                    spec.loader.exec_module(module)
+                except ImportError as e:
+                    message = f"Failed to import module '{module_name}': {e}"
+                    messagebox.showerror(title="ImportError", message=message)
+                    module = None
+                MODULES[path] = module
+            self.modules[module_name] = MODULES[path]
+        return self.modules[module_name]
+
+    def add_placeholder_tab(
+            self, module_name: str, class_name: str, tab_name: str):
+        placeholder = tk.Frame(self.main.tab)
+        tk.Label(placeholder, text=f"Loading {tab_name}...").pack()
+        self.main.tab.add(placeholder, text=tab_name, padding=3)
+        self.placeholders[tab_name] = (placeholder, module_name, class_name)
+        self.tab_modules[tab_name] = module_name
+
+    def add_placeholder_menu(
+            self, module_name: str, class_name: str, menu_name: str):
+        placeholder = tk.Menu(self.main.main_menu, tearoff=False)
+        placeholder["postcommand"] = (
+            lambda: self.load_menu(
+                placeholder, module_name, class_name, menu_name))
+        self.main.main_menu.add_cascade(label=menu_name, menu=placeholder)
+
+    def tab_on_changed(self, _: tk.Event):
+        """this func loads selected tab if it is a placeholder.
+
+        Args:
+            _ (tk.Event): tk.Event(ignored)
+        """
+        selected = self.main.tab.select()
+        for tab_name, (placeholder, _, _) in list(self.placeholders.items()):
+            if str(placeholder) == selected:
+                self.load_tab(tab_name)
+                break
+
+    def load_tab(self, tab_name: str):
+        """this func replaces placeholder of tab_name with the real tab.
+        after this func -> plugin_loaded()
+
+        Args:
+            tab_name (str): name of tab
+        """
+        if (entry := self.placeholders.pop(tab_name, None)) is None:
+            return
+        placeholder, module_name, class_name = entry
+        position = self.main.tab.index(placeholder)
+        tab = None
+        if (module := self.load_module(module_name)) is not None:
+            tab_class = getattr(module, class_name, None)
+            if not isinstance(tab_class, type):
+                pass
+            elif issubclass(tab_class, tab_template.TabTemplate):
+                tab = tab_class(self.main.tab, self)
+            elif issubclass(tab_class, tk.Frame):
+                message = f"""\
+                {tab_name} is a tkinter frame but might not a tab.
+                do you want to load anyway?"""
+                if messagebox.askyesno(
+                        title="confirm", message=dedent(message)):
+                    tab = tab_class(self.main.tab)
+        if tab is not None:
+            self.add_tab(tab_name, tab, position)
+            self.main.tab.select(tab)
+        self.main.tab.forget(placeholder)
+        placeholder.destroy()
+        if tab is not None:
+            self.plugin_loaded(tab_name)
+
+    def load_menu(
+            self, placeholder: tk.Menu, module_name: str,
+            class_name: str, menu_name: str):
+        """this func fills placeholder with entries of the real menu
+        when it is opened first.
+
+        Args:
+            placeholder (tk.Menu): menu in main_menu
+            module_name (str): file name of plugin without .py
+            class_name (str): name of menu class
+            menu_name (str): name of menu
+        """
+        placeholder["postcommand"] = ""
+        if (module := self.load_module(module_name)) is None:
+            return
+        menu_class = getattr(module, class_name, None)
+        if not (isinstance(menu_class, type) and issubclass(
+                menu_class, tk.Menu)):
+            return
+        menu = menu_class(self.main.main_menu, self)
+        self.menus[menu_name] = menu
+        if (last := menu.index(tk.END)) is None:
+            return
+        for i in range(last + 1):
+            options = {
+                key: value[-1]
+                for key, value in menu.entryconfigure(i).items()
+                if len(value) == 5 and value[-1] not in ("", None)}
+            placeholder.add(menu.type(i), **options)
+
+    def load_all(self):
+        """this func loads every placeholder tab at once.
+        """
+        for tab_name in list(self.placeholders):
+            self.load_tab(tab_name)
+
+    def plugin_loaded(self, tab_name: str):
+        """this func refreshes a tab loaded after startup.
+
+        Args:
+            tab_name (str): name of tab
+        """
+        for method in self.hooks.hooks(REFRESH, tab_name):
+            self.run_refresh(tab_name, method)
+
+    def refresh_plugins(self):
+        self.new_generation()
+        for owner, method in self.hooks.items(REFRESH):
+            self.run_refresh(owner, method)
+
+    def new_generation(self):
+        """this func cancels background work of every plugin.
+        """
+        self.generation += 1
+        for token in self.tokens.values():
+            token.cancel()
+        self.tokens = {}
+        for job, entry in list(self.batch_jobs.items()):
+            if entry[4].cancelled:
+                self.cancel_batch(job)
+
+    def token(self, tab_name: str) -> CancelToken:
+        """this func gives the token of tab_name in this generation.
+        pass it to background work and check it before using results.
+
+        Args:
+            tab_name (str): name of tab
+
+        Returns:
+            CancelToken: token cancelled by the next refresh_plugins()
+        """
+        if (token := self.tokens.get(tab_name)) is None:
+            token = CancelToken(self.generation)
+            self.tokens[tab_name] = token
+        return token
+
+    def is_current(self, token: CancelToken) -> bool:
+        return not token.cancelled and token.generation == self.generation
+
+    def is_concurrent(self, tab_name: str) -> bool:
+        """this func checks whether metadata of tab_name allows its
+        collect methods to run off the main thread.
+
+        Args:
+            tab_name (str): name of tab
+
+        Returns:
+            bool: True if metadata has "refresh: concurrent"
+        """
+        module_name = self.tab_modules.get(tab_name)
+        return self.metadata.get(module_name, {}).get(
+            "refresh") == "concurrent"
+
+    def run_refresh(self, owner: str, method, trigger: str = None):
+        """this func calls a refresh method.
+        a pending result of the same method is dropped.
+
+        Args:
+            owner (str): name of tab
+            method (callable): method decorated by RefreshMethod
+            trigger (str, optional): file which triggered the refresh.
+                Defaults to None.
+        """
+        invoke = self.hooks.invoke
+        if (collect := getattr(method, "__collect__", None)) is None:
+            invoke(owner, REFRESH, method, trigger=trigger)
+            return
+        collector = getattr(method.__self__, collect)
+        if not self.is_concurrent(owner):
+            data = invoke(owner, COLLECT, collector, trigger=trigger)
+            invoke(owner, REFRESH, method, data, trigger=trigger)
+            return
+        if not self.pending_refreshes:
+            self.main.after(self.REFRESH_INTERVAL, self.apply_refreshes)
+        token = self.token(owner)
+        future = self.executor.submit(
+            self.run_with_token, token, invoke, owner, COLLECT, collector,
+            trigger=trigger)
+        self.pending_refreshes[(owner, method.__name__)] = (
+            future, method, trigger, token)
+
+    def apply_refreshes(self):
+        """this func passes finished results of collect methods to their
+        refresh methods on the main loop.
+        this func calls itself while results are pending.
+        """
+        for key, entry in list(self.pending_refreshes.items()):
+            future, method, trigger, token = entry
+            if not future.done():
+                continue
+            del self.pending_refreshes[key]
+            if token.cancelled:
+                continue
+            try:
+                data = future.result()
+            except Exception:
+                self.main.report_callback_exception(*sys.exc_info())
+                continue
+            self.hooks.invoke(key[0], REFRESH, method, data, trigger=trigger)
+        if self.pending_refreshes:
+            self.main.after(self.REFRESH_INTERVAL, self.apply_refreshes)
+
+    def publish(self, event: str, *args):
+        """this func notifies subscribers that something changed.
+        use it instead of refresh_main() to refresh only plugins which
+        depend on the change.
+
+        Args:
+            event (str): name of event such as PACKAGES_CHANGED
+            *args: payload of event
+        """
+        self.events.publish(event, *args)
+
+    @staticmethod
+    def run_with_token(token: CancelToken, function, *args, **kwargs):
+        """this func calls function in a worker thread with token as the
+        current token of the thread.
+        """
+        set_current_token(token)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            set_current_token(None)
+
+    def host_of(self, tab_name: str) -> str | None:
+        module_name = self.tab_modules.get(tab_name)
+        return self.metadata.get(module_name, {}).get("host")
+
+    def runs_in_host(self, tab_name: str) -> bool:
+        return self.host_of(tab_name) == "process"
+
+    def run_batch(
+            self, tab_name: str, function_name: str, paths: list,
+            on_result, on_done=None, token: CancelToken = None,
+            args: tuple = ()) -> int:
+        """this func calls a module-level function of the plugin of
+        tab_name with each path off the main thread.
+        the function must not touch widgets, and in a host process or a
+        process pool its arguments and result must be picklable.
+        a process pool is used only for batches larger than POOL_CHUNK,
+        since starting its workers costs more than a few files.
+
+        Args:
+            tab_name (str): name of tab
+            function_name (str): name of function in the plugin module
+            paths (list): paths to files
+            on_result (callable): called on the main loop with (path,
+                result) for each path as results arrive
+            on_done (callable, optional): called on the main loop when
+                every path is done. Defaults to None.
+            token (CancelToken, optional): the batch is stopped when it
+                is cancelled. Defaults to None (token of tab_name).
+            args (tuple, optional): extra arguments passed after path.
+                Defaults to ().
+
+        Returns:
+            int: id of batch for cancel_batch()
+        """
+        job = next(self.batch_ids)
+        module_name = self.tab_modules[tab_name]
+        token = self.token(tab_name) if token is None else token
+        if not self.batch_jobs:
+            self.main.after(self.REFRESH_INTERVAL, self.apply_batches)
+        self.batch_jobs[job] = (
+            tab_name, function_name, on_result, on_done, token)
+        # a token may be cancelled by any thread, so the batch is stopped
+        # by apply_batches on the main loop.
+        token.on_cancel(lambda: self.batch_messages.put((CANCEL, job)))
+        module_path = os.path.join(self.PLUGIN_DIR, module_name + ".py")
+        host = self.host_of(tab_name)
+        if host == "process":
+            self.host.submit(
+                job, module_path, function_name, list(paths), args)
+        elif host == "pool" and len(paths) > self.POOL_CHUNK:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    mp_context=multiprocessing.get_context("spawn"))
+            self.executor.submit(
+                self.run_pool, job, module_path, function_name, list(paths),
+                args)
+        else:
+            function = getattr(self.load_module(module_name), function_name)
+            self.executor.submit(
+                self.run_with_token, token, self.run_inline, job, function,
+                list(paths), args)
+        return job
+
+    def run_inline(
+            self, job: int, function, paths: list, args: tuple = ()):
+        """this func runs a batch in the thread pool and puts the same
+        messages as the host process.
+        """
+        for path in paths:
+            if job not in self.batch_jobs:
+                break
+            start_time = time.perf_counter()
+            try:
+                value = function(path, *args)
+            except Cancelled:
+                break
+            except Exception:
+                self.batch_messages.put(
+                    (ERROR, job, path, traceback.format_exc()))
+            else:
+                self.batch_messages.put((
+                    RESULT, job, path, value,
+                    time.perf_counter() - start_time))
+        self.batch_messages.put((DONE, job))
+
+    def run_pool(
+            self, job: int, module_path: str, function_name: str,
+            paths: list, args: tuple = ()):
+        """this func splits a batch into chunks of POOL_CHUNK paths, runs
+        them in the process pool and puts the messages of each chunk as
+        soon as it is done. it waits in a thread of the thread pool.
+        """
+        futures = [
+            self.pool.submit(
+                run_chunk, module_path, function_name,
+                paths[i:i + self.POOL_CHUNK], args)
+            for i in range(0, len(paths), self.POOL_CHUNK)]
+        self.pool_futures[job] = futures
+        try:
+            for future in as_completed(futures):
+                if job not in self.batch_jobs:
+                    break
+                if future.cancelled():
+                    continue
+                for kind, *result in future.result():
+                    self.batch_messages.put((kind, job, *result))
+        except Exception:
+            self.batch_messages.put(
+                (ERROR, job, None, traceback.format_exc()))
+        finally:
+            for future in self.pool_futures.pop(job, futures):
+                future.cancel()
+        self.batch_messages.put((DONE, job))
+
+    def cancel_batch(self, job: int):
+        """this func stops a batch. results which arrive later are
+        dropped, and on_done is not called.
+
+        Args:
+            job (int): id returned by run_batch()
+        """
+        if self.batch_jobs.pop(job, None) is not None:
+            self.host.cancel(job)
+            for future in self.pool_futures.get(job, ()):
+                future.cancel()
+
+    def apply_batches(self):
+        """this func passes results of batches to their callbacks on the
+        main loop.
+        this func calls itself while batches are running.
+        """
+        for _ in range(self.BATCH_MESSAGES):
+            try:
+                message = self.batch_messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == EXITED:
+                for job in message[1]:
+                    if job in self.batch_jobs:
+                        sys.stderr.write(
+                            f"ERROR: Plugin host exited during batch {job}\n")
+                        self.finish_batch(job)
+                continue
+            if message[0] == CANCEL:
+                self.cancel_batch(message[1])
+                continue
+            if (entry := self.batch_jobs.get(message[1])) is None:
+                continue
+            tab_name, function_name, on_result, _, _ = entry
+            if message[0] == RESULT:
+                _, _, path, value, seconds = message
+                self.profiler.record(
+                    tab_name, HOST, function_name, seconds, path)
+                try:
+                    on_result(path, value)
+                except Exception:
+                    self.main.report_callback_exception(*sys.exc_info())
+            elif message[0] == ERROR:
+                sys.stderr.write(
+                    f"ERROR: {tab_name}.{function_name} failed for "
+                    f"{message[2]}:\n{message[3]}")
+            elif message[0] == DONE:
+                self.finish_batch(message[1])
+        if self.batch_jobs:
+            self.main.after(self.REFRESH_INTERVAL, self.apply_batches)
+
+    def finish_batch(self, job: int):
+        if (entry := self.batch_jobs.pop(job, None)) is not None:
+            if (on_done := entry[3]) is not None:
+                try:
+                    on_done()
+                except Exception:
+                    self.main.report_callback_exception(*sys.exc_info())
+
+    @property
+    def refreshing(self) -> bool:
+        return bool(self.pending_refreshes) or bool(self.batch_jobs)
+
+    def close(self):
+        """this func drops pending refreshes and batches, and stops the
+        thread pool, the host process and the process pool.
+        """
+        self.pending_refreshes = {}
+        self.batch_jobs = {}
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.host.close()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def register_tab(self, tab_name: str, tab: tk.Frame):
+        self.hooks.register_plugin(tab_name, tab)
+
+    def add_tab(self, name: str, tab: tk.Frame, position=tk.END):
+        """this func adds tab to notebook and registers its hooks.
+
+        Args:
+            name (str): tab name
+            tab (tk.Frame): tab instance
+            position (int | str, optional): position in notebook.
+                Defaults to tk.END.
+        """
+        self.main.tab.insert(position, tab, text=name, padding=3)
+        self.tabs[name] = tab
+        self.register_tab(name, tab)
+
+    def remove_tab(self, name: str):
+        """this func removes tab (or its placeholder) from notebook and
+        unregisters its hooks.
+
+        Args:
+            name (str): tab name
+        """
+        if (tab := self.tabs.pop(name, None)) is not None:
+            self.hooks.unregister(name)
+            self.main.tab.forget(tab)
+        elif (entry := self.placeholders.pop(name, None)) is not None:
+            self.main.tab.forget(entry[0])
+            entry[0].destroy()
+
+    def __getitem__(self, key: str) -> dict:
+        if key == "tab":
+            return self.tabs
+        elif key == "menu":
+            return self.menus
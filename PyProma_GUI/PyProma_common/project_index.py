@@ -0,0 +1,368 @@
+import os
+from array import array
+from collections import deque
+
+KIND_FILE = 0
+KIND_DIR = 1
+KIND_REMOVED = 2
+
+
+class ProjectIndex:
+    """this class keeps one listing of a project directory.
+
+    entries are stored column-wise in arrays and linked as a tree with
+    parent, first_child and next_sibling indexes, so a large project
+    costs a few bytes per entry plus its name.
+    index 0 is the project directory itself. lookup maps (parent, name)
+    to index, so that find() doesn't walk lists of siblings.
+    removed entries are unlinked and marked KIND_REMOVED until the next
+    build.
+    """
+
+    def __init__(self, root: str = "", ignore=None):
+        self.root = ""
+        self.ignore = None
+        self.complete = False
+        self.last_scanned = -1
+        self.clear()
+        if root:
+            self.build(root, ignore)
+
+    def clear(self):
+        """this func removes all entries.
+        """
+        self.names = []
+        self.parents = array("l")
+        self.first_child = array("l")
+        self.next_sibling = array("l")
+        self.kinds = array("b")
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.lookup = {}
+
+    def rebuild_lookup(self):
+        """this func makes lookup from arrays set directly (e.g. by
+        scan_cache.load_index).
+        """
+        self.lookup = {
+            (parent, name): index
+            for index, (parent, name, kind) in enumerate(
+                zip(self.parents, self.names, self.kinds))
+            if parent >= 0 and kind != KIND_REMOVED}
+
+    def build(
+            self, root: str, ignore=None, cancel=None, callback=None):
+        """this func scans root once with os.scandir and stores
+        path, size, mtime and type of every entry.
+        directories are scanned breadth-first, so a directory is
+        listed if its index is not greater than last_scanned.
+
+        Args:
+            root (str): path to project directory
+            ignore (IgnoreMatcher, optional): ignored entries are not
+                stored and ignored directories are never entered.
+                Defaults to None.
+            cancel (threading.Event, optional): scan stops when this is
+                set. Defaults to None.
+            callback (callable, optional): called with indexes of
+                entries of each listed directory. Defaults to None.
+        """
+        self.clear()
+        self.root = os.path.normpath(root)
+        self.ignore = ignore
+        self.complete = False
+        self.last_scanned = -1
+        try:
+            mtime = os.stat(self.root).st_mtime
+        except OSError:
+            mtime = 0.0
+        self._append("", -1, KIND_DIR, 0, mtime)
+        queue = deque([(0, self.root)])
+        while queue:
+            if cancel is not None and cancel.is_set():
+                return
+            index, path = queue.popleft()
+            added = self._scan_dir(index, path)
+            self.last_scanned = index
+            for child, child_path in added:
+                if self.kinds[child] == KIND_DIR:
+                    queue.append((child, child_path))
+            if callback is not None and added:
+                callback([child for child, _ in added])
+        self.complete = True
+
+    def is_scanned(self, index: int) -> bool:
+        """this func checks whether directory at index is listed yet.
+
+        Args:
+            index (int): index of directory
+
+        Returns:
+            bool: True if its children are indexed
+        """
+        return self.complete or index <= self.last_scanned
+
+    def _scan_dir(self, index: int, path: str) -> list:
+        """this func lists path and links its entries under index.
+
+        Args:
+            index (int): index of directory
+            path (str): path to directory
+
+        Returns:
+            list: (index, path) of added entries
+        """
+        added = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if (
+                            self.ignore is not None
+                            and self.ignore.is_ignored(entry.path, is_dir)):
+                        continue
+                    try:
+                        stat = entry.stat()
+                        size, mtime = stat.st_size, stat.st_mtime
+                    except OSError:
+                        size, mtime = 0, 0.0
+                    child = self._append(
+                        entry.name, index,
+                        KIND_DIR if is_dir else KIND_FILE,
+                        0 if is_dir else size, mtime)
+                    added.append((child, entry.path))
+        except OSError:
+            return added
+        previous = -1
+        for child, _ in added:
+            if previous == -1:
+                self.first_child[index] = child
+            else:
+                self.next_sibling[previous] = child
+            previous = child
+        return added
+
+    def _append(
+            self, name: str, parent: int,
+            kind: int, size: int, mtime: float) -> int:
+        self.names.append(name)
+        self.parents.append(parent)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        index = len(self.names) - 1
+        if parent >= 0:
+            self.lookup[(parent, name)] = index
+        return index
+
+    def add(self, path: str) -> list:
+        """this func adds path (and its contents if it is a directory).
+        if path is already indexed, it is updated instead.
+
+        Args:
+            path (str): absolute path
+
+        Returns:
+            list: absolute paths of added files
+        """
+        if self.find(path) != -1:
+            self.update(path)
+            return []
+        parent = self.find(os.path.dirname(path))
+        if parent == -1 or not self.is_dir(parent):
+            return []
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        is_dir = os.path.isdir(path)
+        if self.ignore is not None and self.ignore.is_ignored(path, is_dir):
+            return []
+        index = self._append(
+            os.path.basename(path), parent,
+            KIND_DIR if is_dir else KIND_FILE,
+            0 if is_dir else stat.st_size, stat.st_mtime)
+        last = -1
+        for last in self.children(parent):
+            pass
+        if last == -1:
+            self.first_child[parent] = index
+        else:
+            self.next_sibling[last] = index
+        if not is_dir:
+            return [self.path(index)]
+        added = []
+        queue = deque([(index, self.path(index))])
+        while queue:
+            directory, directory_path = queue.popleft()
+            for child, child_path in self._scan_dir(
+                    directory, directory_path):
+                if self.kinds[child] == KIND_DIR:
+                    queue.append((child, child_path))
+                else:
+                    added.append(child_path)
+        return added
+
+    def remove(self, path: str) -> list:
+        """this func removes path and its contents.
+
+        Args:
+            path (str): absolute path
+
+        Returns:
+            list: absolute paths of removed files
+        """
+        index = self.find(path)
+        if index <= 0:
+            return []
+        parent = self.parents[index]
+        if self.first_child[parent] == index:
+            self.first_child[parent] = self.next_sibling[index]
+        else:
+            for child in self.children(parent):
+                if self.next_sibling[child] == index:
+                    self.next_sibling[child] = self.next_sibling[index]
+                    break
+        removed = []
+        stack = [index]
+        while stack:
+            entry = stack.pop()
+            if self.kinds[entry] == KIND_FILE:
+                removed.append(self.path(entry))
+            stack.extend(self.children(entry))
+            self.kinds[entry] = KIND_REMOVED
+            self.lookup.pop((self.parents[entry], self.names[entry]), None)
+        return removed
+
+    def update(self, path: str):
+        """this func refreshes size and mtime of path.
+
+        Args:
+            path (str): absolute path
+        """
+        if (index := self.find(path)) != -1:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+            if self.kinds[index] == KIND_FILE:
+                self.sizes[index] = stat.st_size
+            self.mtimes[index] = stat.st_mtime
+
+    def compacted(self) -> "ProjectIndex":
+        """this func makes a copy without removed entries.
+        indexes of entries change, so the copy is meant to be saved
+        rather than to replace an index whose indexes are in use.
+
+        Returns:
+            ProjectIndex: copy with live entries only
+        """
+        if KIND_REMOVED not in self.kinds:
+            return self
+        copy = ProjectIndex()
+        copy.root = self.root
+        copy.ignore = self.ignore
+        copy.complete = self.complete
+        copy.last_scanned = -1
+        new_indexes = {}
+        stack = [0] if self.names else []
+        while stack:
+            index = stack.pop()
+            parent = self.parents[index]
+            new_indexes[index] = copy._append(
+                self.names[index],
+                new_indexes[parent] if parent >= 0 else -1,
+                self.kinds[index], self.sizes[index], self.mtimes[index])
+            stack.extend(reversed(list(self.children(index))))
+        for index, new_index in new_indexes.items():
+            for name in ("first_child", "next_sibling"):
+                old = getattr(self, name)[index]
+                getattr(copy, name)[new_index] = new_indexes.get(old, -1)
+        return copy
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def children(self, index: int = 0):
+        """this func iterates indexes of direct children.
+
+        Args:
+            index (int, optional): index of directory. Defaults to 0.
+
+        Yields:
+            int: index of child
+        """
+        child = self.first_child[index]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def relpath(self, index: int) -> str:
+        """this func makes path relative to root from index.
+
+        Args:
+            index (int): index of entry
+
+        Returns:
+            str: relative path ("" for root)
+        """
+        parts = []
+        while index > 0:
+            parts.append(self.names[index])
+            index = self.parents[index]
+        return os.path.join(*reversed(parts)) if parts else ""
+
+    def path(self, index: int) -> str:
+        """this func makes absolute path from index.
+
+        Args:
+            index (int): index of entry
+
+        Returns:
+            str: absolute path
+        """
+        relpath = self.relpath(index)
+        return os.path.join(self.root, relpath) if relpath else self.root
+
+    def find(self, path: str) -> int:
+        """this func finds index of path.
+
+        Args:
+            path (str): absolute path or path relative to root
+
+        Returns:
+            int: index of entry or -1 if it is not indexed
+        """
+        if not self.names:
+            return -1
+        relpath = os.path.relpath(os.path.join(self.root, path), self.root)
+        index = 0
+        if relpath == ".":
+            return index
+        for part in relpath.split(os.sep):
+            if (index := self.lookup.get((index, part))) is None:
+                return -1
+        return index
+
+    def is_dir(self, index: int) -> bool:
+        return self.kinds[index] == KIND_DIR
+
+    def iter_files(self, suffix: str = None):
+        """this func iterates absolute paths of indexed files.
+
+        Args:
+            suffix (str, optional): extension such as ".py".
+                Defaults to None (all files).
+
+        Yields:
+            str: absolute path to file
+        """
+        for index, kind in enumerate(self.kinds):
+            if kind == KIND_FILE and (
+                    suffix is None or self.names[index].endswith(suffix)):
+                yield self.path(index)
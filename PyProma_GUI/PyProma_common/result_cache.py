@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from PyProma_common.user_cache import project_cache_path
+
+MAX_BYTES = 64 << 20
+COMMIT_SIZE = 256
+EVICT_SIZE = 64
+
+
+def result_cache_path(dir_path: str) -> str:
+    # results are kept in memory if there is no cache directory
+    return project_cache_path(dir_path, "results.sqlite3") or ":memory:"
+
+
+def file_key(path: str, content_hash: bool = False) -> str | None:
+    """this func makes a key which changes when a file changes.
+
+    Args:
+        path (str): path to file
+        content_hash (bool, optional): use SHA-1 of contents instead of
+            mtime and size. Defaults to False.
+
+    Returns:
+        str | None: key or None if file can't be read
+    """
+    try:
+        if not content_hash:
+            stat = os.stat(path)
+            return f"{stat.st_mtime_ns}:{stat.st_size}"
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return "sha1:" + digest.hexdigest()
+    except OSError:
+        return None
+
+
+class ResultCache:
+    """this class stores JSON results of plugins in an SQLite file.
+
+    a result is kept per (plugin, path) with the plugin version and the
+    file key it was computed for, and is returned only if both still
+    match. least recently used results are evicted when the total size
+    of values exceeds max_bytes. it can be used from worker threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES):
+        """this constructor opens (or creates) the cache file.
+        a broken file is replaced with an empty cache.
+
+        Args:
+            path (str): path to SQLite file (":memory:" for no file)
+            max_bytes (int, optional): limit of total size of values.
+                Defaults to MAX_BYTES.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._changes = 0
+        try:
+            self._db = self._connect(path)
+        except sqlite3.DatabaseError:
+            try:
+                os.remove(path)
+                self._db = self._connect(path)
+            except (OSError, sqlite3.DatabaseError):
+                self._db = self._connect(":memory:")
+        self._bytes, self._clock = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) "
+            "FROM results").fetchone()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "plugin TEXT, path TEXT, version TEXT, key TEXT, "
+                "value TEXT, size INTEGER, used INTEGER, "
+                "PRIMARY KEY (plugin, path))")
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS results_used "
+                "ON results (used)")
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def get(
+            self, plugin: str, version: str, path: str, key: str,
+            default=None):
+        """this func fetches a result and marks it as recently used.
+
+        Args:
+            plugin (str): name of plugin
+            version (str): version of plugin
+            path (str): path to file
+            key (str): key of file made by file_key
+            default (object, optional): returned if there is no valid
+                result. Defaults to None.
+
+        Returns:
+            object: result or default
+        """
+        if key is None:
+            return default
+        with self._lock:
+            if self._db is None:
+                return default
+            row = self._db.execute(
+                "SELECT value FROM results WHERE plugin = ? AND path = ? "
+                "AND version = ? AND key = ?",
+                (plugin, path, version, key)).fetchone()
+            if row is None:
+                return default
+            self._clock += 1
+            self._db.execute(
+                "UPDATE results SET used = ? WHERE plugin = ? AND path = ?",
+                (self._clock, plugin, path))
+            self._changed()
+        return json.loads(row[0])
+
+    def put(self, plugin: str, version: str, path: str, key: str, value):
+        """this func stores a result and evicts old results if needed.
+
+        Args:
+            plugin (str): name of plugin
+            version (str): version of plugin
+            path (str): path to file
+            key (str): key of file made by file_key
+            value (object): JSON serializable result
+        """
+        if key is None:
+            return
+        text = json.dumps(value)
+        with self._lock:
+            if self._db is None:
+                return
+            self._bytes -= self._size_of(plugin, path)
+            self._clock += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (plugin, path, version, key, text, len(text), self._clock))
+            self._bytes += len(text)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._changed()
+
+    def remove(self, plugin: str, path: str):
+        with self._lock:
+            if self._db is None:
+                return
+            self._bytes -= self._size_of(plugin, path)
+            self._db.execute(
+                "DELETE FROM results WHERE plugin = ? AND path = ?",
+                (plugin, path))
+            self._changed()
+
+    def invalidate(self, plugin: str, version: str = None):
+        """this func removes results of plugin made by other versions.
+
+        Args:
+            plugin (str): name of plugin
+            version (str, optional): version to keep.
+                Defaults to None (remove every result of plugin).
+        """
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "DELETE FROM results WHERE plugin = ? AND version IS NOT ?",
+                (plugin, version))
+            self._bytes = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            self._changed()
+
+    def _size_of(self, plugin: str, path: str) -> int:
+        row = self._db.execute(
+            "SELECT size FROM results WHERE plugin = ? AND path = ?",
+            (plugin, path)).fetchone()
+        return 0 if row is None else row[0]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT plugin, path, size FROM results "
+                "ORDER BY used LIMIT ?", (EVICT_SIZE,)).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            for plugin, path, size in rows:
+                self._db.execute(
+                    "DELETE FROM results WHERE plugin = ? AND path = ?",
+                    (plugin, path))
+                self._bytes -= size
+                if self._bytes <= self.max_bytes:
+                    return
+
+    def _changed(self):
+        self._changes += 1
+        if self._changes >= COMMIT_SIZE:
+            self._db.commit()
+            self._changes = 0
+
+    def close(self):
+        """this func writes pending changes and closes the file.
+        later calls of other methods do nothing.
+        """
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.commit()
+            except sqlite3.Error:
+                pass
+            self._db.close()
+            self._db = None
+
+
+class PluginCache:
+    """this class is a view of ResultCache for one version of a plugin.
+    """
+
+    def __init__(
+            self, cache: ResultCache, plugin: str, version: str,
+            content_hash: bool = False):
+        """this constructor drops results of other versions of plugin.
+
+        Args:
+            cache (ResultCache): shared cache
+            plugin (str): name of plugin
+            version (str): version in metadata of plugin
+            content_hash (bool, optional): key files by SHA-1 of contents
+                instead of mtime and size. Defaults to False.
+        """
+        self.cache = cache
+        self.plugin = plugin
+        self.version = version
+        self.content_hash = content_hash
+        cache.invalidate(plugin, version)
+
+    def key(self, path: str) -> str | None:
+        return file_key(path, self.content_hash)
+
+    def get(self, path: str, default=None, key: str = None):
+        """this func fetches the result for the current contents of path.
+
+        Args:
+            path (str): path to file
+            default (object, optional): returned if there is no valid
+                result. Defaults to None.
+            key (str, optional): key got by key(). Defaults to None
+                (made from path).
+
+        Returns:
+            object: result or default
+        """
+        return self.cache.get(
+            self.plugin, self.version, path,
+            self.key(path) if key is None else key, default)
+
+    def put(self, path: str, value, key: str = None):
+        """this func stores the result for path.
+        pass the key got before reading path, so that a file changed
+        while it is processed is not cached with its new key.
+
+        Args:
+            path (str): path to file
+            value (object): JSON serializable result
+            key (str, optional): key got by key(). Defaults to None
+                (made from path).
+        """
+        self.cache.put(
+            self.plugin, self.version, path,
+            self.key(path) if key is None else key, value)
+
+    def remove(self, path: str):
+        self.cache.remove(self.plugin, path)
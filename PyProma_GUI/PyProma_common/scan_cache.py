@@ -0,0 +1,101 @@
+import os
+import struct
+import zlib
+from array import array
+
+from PyProma_common.project_index import ProjectIndex
+from PyProma_common.user_cache import project_cache_path
+
+MAGIC = b"PyProma-scan-1\n"
+COLUMNS = (
+    ("parents", "l"), ("first_child", "l"), ("next_sibling", "l"),
+    ("kinds", "b"), ("sizes", "q"), ("mtimes", "d"))
+HEADER = struct.Struct("<QI")
+
+
+def cache_path(dir_path: str) -> str | None:
+    return project_cache_path(dir_path, "scan.bin")
+
+
+def save_index(index: ProjectIndex, fingerprint: str = ""):
+    """this func writes index of a finished scan to the cache file.
+    removed entries are dropped. columns are stored as raw arrays and
+    names are joined with NUL, then everything is compressed with zlib.
+
+    Args:
+        index (ProjectIndex): index to save
+        fingerprint (str, optional): settings the index depends on.
+            Defaults to "".
+    """
+    if not index.complete or len(index) == 0:
+        return
+    index = index.compacted()
+    parts = [
+        HEADER.pack(len(index), len(fingerprint.encode())),
+        fingerprint.encode(),
+        bytes([array("l").itemsize])]
+    for name, _ in COLUMNS:
+        parts.append(getattr(index, name).tobytes())
+    parts.append(
+        "\0".join(index.names).encode("utf-8", "surrogateescape"))
+    try:
+        if (path := cache_path(index.root)) is None:
+            return
+        with open(path + ".tmp", "wb") as f:
+            f.write(MAGIC)
+            f.write(zlib.compress(b"".join(parts), 1))
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def load_index(
+        dir_path: str, fingerprint: str = "", ignore=None) -> ProjectIndex:
+    """this func reads the last scan of dir_path from the cache file.
+
+    Args:
+        dir_path (str): path to project directory
+        fingerprint (str, optional): must equal the saved one.
+            Defaults to "".
+        ignore (IgnoreMatcher, optional): ignore matcher for later
+            updates of the index. Defaults to None.
+
+    Returns:
+        ProjectIndex: cached index or None if there is no usable cache
+    """
+    if (path := cache_path(dir_path)) is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            data = zlib.decompress(f.read())
+    except (OSError, zlib.error):
+        return None
+    try:
+        count, fingerprint_size = HEADER.unpack_from(data)
+        offset = HEADER.size
+        saved = data[offset:offset + fingerprint_size].decode()
+        offset += fingerprint_size
+        itemsize = data[offset]
+        offset += 1
+        if saved != fingerprint or itemsize != array("l").itemsize:
+            return None
+        index = ProjectIndex()
+        for name, typecode in COLUMNS:
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+            setattr(index, name, column)
+        index.names = data[offset:].decode(
+            "utf-8", "surrogateescape").split("\0")
+    except (struct.error, ValueError, UnicodeDecodeError, IndexError):
+        return None
+    if len(index.names) != count:
+        return None
+    index.root = os.path.normpath(dir_path)
+    index.ignore = ignore
+    index.complete = True
+    index.rebuild_lookup()
+    return index
@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import stat
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+import tkinter.ttk as ttk
+
+import git
+import toml
+from PyProma_common.hook_registry import PYFILES, REFRESH
+from PyProma_common.ignore_rules import IgnoreMatcher
+from PyProma_common.project_index import ProjectIndex
+from PyProma_dir_view.plugins import plugin_manager
+from PyProma_dir_view.PyProma_dir_view_script import DirView
+
+FILES_PER_DIR = 20
+LINES_PER_FILE = 40
+TODO_TAGS = ("TODO", "BUG", "FIXME", "HACK")
+OTHER_SUFFIXES = (".txt", ".md", ".json", ".cfg")
+
+
+def remove_readonly(function, path: str, _):
+    """this func makes a read-only file (e.g. a git object on Windows)
+    writable and removes it again. it is used as onerror of rmtree.
+    """
+    os.chmod(path, stat.S_IWRITE)
+    function(path)
+
+
+def make_project(
+        path: str, files: int, depth: int = 4, py_ratio: float = 0.5,
+        todo_density: float = 0.02, commits: int = 5, seed: int = 0):
+    """this func generates a synthetic project.
+    a project generated with the same arguments is reused, and one
+    generated with other arguments is removed first. a directory which
+    was not generated by this func is never removed.
+
+    Args:
+        path (str): path to project directory
+        files (int): number of files
+        depth (int, optional): max depth of directories. Defaults to 4.
+        py_ratio (float, optional): ratio of .py files. Defaults to 0.5.
+        todo_density (float, optional): ratio of lines of .py files
+            which are ToDo comments. Defaults to 0.02.
+        commits (int, optional): number of git commits (0 for no
+            repository). Defaults to 5.
+        seed (int, optional): random seed. Defaults to 0.
+    """
+    params = {
+        "files": files, "depth": depth, "py_ratio": py_ratio,
+        "todo_density": todo_density, "commits": commits, "seed": seed}
+    manifest = path.rstrip(os.sep) + ".json"
+    try:
+        with open(manifest) as f:
+            if json.load(f) == params and os.path.isdir(path):
+                return
+    except (OSError, ValueError):
+        pass
+    if os.path.isdir(path):
+        if not os.path.isfile(manifest) and os.listdir(path):
+            raise FileExistsError(
+                f"{path} is not empty and was not made by make_project")
+        shutil.rmtree(path, onerror=remove_readonly)
+    if os.path.isfile(manifest):
+        os.remove(manifest)
+    rng = random.Random(seed)
+    dirs = [("", 0)]
+    for i in range(max(1, files // FILES_PER_DIR) - 1):
+        parent, level = rng.choice(
+            [d for d in dirs[-50:] if d[1] < depth] or dirs[:1])
+        dirs.append((os.path.join(parent, f"pkg_{i}"), level + 1))
+    for directory, _ in dirs:
+        os.makedirs(os.path.join(path, directory), exist_ok=True)
+    written = []
+    with open(os.path.join(path, "README.md"), "w") as f:
+        f.write(f"# Synthetic project\n\n{files} files\n")
+    for i in range(files - 1):
+        directory = dirs[i % len(dirs)][0]
+        if rng.random() < py_ratio:
+            relpath = os.path.join(directory, f"module_{i}.py")
+            lines = []
+            for j in range(LINES_PER_FILE):
+                if rng.random() < todo_density:
+                    lines.append(
+                        f"# {rng.choice(TODO_TAGS)} fix item {i}-{j}\n")
+                elif j % 4 == 0:
+                    lines.append(f"def function_{j}(value):\n")
+                else:
+                    lines.append(f"    value = value + {j}  # step\n")
+            lines.append("    return value\n")
+        else:
+            relpath = os.path.join(
+                directory, f"data_{i}{rng.choice(OTHER_SUFFIXES)}")
+            lines = [f"line {j}\n" for j in range(rng.randint(1, 20))]
+        with open(os.path.join(path, relpath), "w") as f:
+            f.writelines(lines)
+        written.append(relpath)
+    if commits:
+        repo = git.Repo.init(path)
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "benchmark")
+            config.set_value("user", "email", "benchmark@example.com")
+        repo.git.add(A=True)
+        repo.index.commit("initial commit")
+        for i in range(1, commits):
+            changed = rng.sample(written, min(10, len(written)))
+            for relpath in changed:
+                with open(os.path.join(path, relpath), "a") as f:
+                    f.write(f"# change {i}\n")
+            repo.index.add(changed)
+            repo.index.commit(f"change {i}")
+    with open(manifest, "w") as f:
+        json.dump(params, f)
+
+
+def measure(function, repeat: int) -> dict:
+    """this func calls function repeat times.
+
+    Args:
+        function (callable): function to measure
+        repeat (int): number of calls
+
+    Returns:
+        dict: min and median seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+class BenchMain:
+    """this class stands in for DirView without mainloop, so that its
+    tree methods and bundled plugins run in a withdrawn window.
+    """
+    make_dir_tree = DirView.make_dir_tree
+    fill_dir_node = DirView.fill_dir_node
+    node_values = DirView.node_values
+
+    def __init__(self, root: tk.Tk, dir_path: str, index: ProjectIndex):
+        self.dir_path = dir_path
+        self.stats = None
+        self.main_menu = tk.Menu(root)
+        self.dir_tree = ttk.Treeview(root)
+        self.tab = ttk.Notebook(root)
+        self.plugins = plugin_manager.PluginManager(self)
+        self.plugins.index = index
+
+    def refresh_trees(self, use_cache: bool = False):
+        pass
+
+    def clear_tree(self):
+        self.dir_tree.delete(*self.dir_tree.get_children())
+
+
+def run_benchmark(
+        dir_path: str, repeat: int = 3, skip=("Linter",)) -> dict:
+    """this func measures DirView and plugins on a project.
+
+    Args:
+        dir_path (str): path to project directory
+        repeat (int, optional): calls of each measurement. Defaults to 3.
+        skip (iterable, optional): plugins whose hooks are not measured.
+            Defaults to ("Linter",) because its PyFileMethod starts
+            linters in subprocesses for every file.
+
+    Returns:
+        dict: measurement name -> min and median seconds, and counts
+    """
+    ignore = IgnoreMatcher(dir_path)
+    index = ProjectIndex()
+    results = {
+        "scan": measure(lambda: index.build(dir_path, ignore), repeat)}
+    py_files = list(index.iter_files(".py"))
+    results["counts"] = {
+        "entries": len(index),
+        "files": sum(1 for _ in index.iter_files()),
+        "py_files": len(py_files)}
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"WARNING: Skipping GUI measurements: {e}")
+        return results
+    root.withdraw()
+    main = BenchMain(root, dir_path, index)
+    for name in skip:
+        main.plugins.remove_tab(name)
+    main.plugins.load_all()
+
+    def make_dir_tree():
+        main.clear_tree()
+        main.make_dir_tree(dir_path)
+        root.update()
+
+    def fill_dir_node():
+        main.clear_tree()
+        main.fill_dir_node(dir_path)
+        root.update()
+
+    def refresh(run):
+        run()
+        while main.plugins.refreshing:
+            root.update()
+            time.sleep(0.001)
+
+    def run_pyfile_plugins():
+        for path in py_files:
+            main.plugins.run_pyfile_plugin(path)
+
+    results["make_dir_tree"] = measure(make_dir_tree, repeat)
+    results["fill_dir_node"] = measure(fill_dir_node, repeat)
+    results["refresh_plugins"] = measure(
+        lambda: refresh(main.plugins.refresh_plugins), repeat)
+    results["run_pyfile_plugins"] = measure(run_pyfile_plugins, repeat)
+    for name, method in main.plugins.hooks.items(REFRESH):
+        results[f"refresh.{name}.{method.__name__}"] = measure(
+            lambda: refresh(lambda: main.plugins.run_refresh(name, method)),
+            repeat)
+    for name, method in main.plugins.hooks.items(PYFILES):
+        results[f"run_pyfile_plugin.{name}.{method.__name__}"] = measure(
+            lambda: method(py_files), repeat)
+    results["hooks"] = main.plugins.profiler.summary()
+    root.update()
+    main.plugins.close()
+    root.destroy()
+    return results
+
+
+def compare(current: dict, previous: dict, threshold: float = 1.2):
+    """this func prints ratio of medians of two result files.
+
+    Args:
+        current (dict): new results
+        previous (dict): old results
+        threshold (float, optional): ratio reported as regression.
+            Defaults to 1.2.
+    """
+    print(f"{previous['version']} -> {current['version']}")
+    for size, results in current["results"].items():
+        old_results = previous["results"].get(size, {})
+        for name, result in results.items():
+            if name in ("counts", "hooks") or name not in old_results:
+                continue
+            old = old_results[name]["median"]
+            ratio = result["median"] / old if old else float("inf")
+            mark = "REGRESSION" if ratio > threshold else ""
+            print(f"{size:>7} {name:<60} {ratio:6.2f} {mark}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure DirView and plugins on synthetic projects.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--py-ratio", type=float, default=0.5)
+    parser.add_argument("--todo-density", type=float, default=0.02)
+    parser.add_argument("--commits", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip", nargs="*", default=["Linter"])
+    parser.add_argument(
+        "--workdir",
+        default=os.path.join(tempfile.gettempdir(), "PyProma_benchmark"))
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="result file to compare with")
+    args = parser.parse_args()
+
+    with open(os.path.join(
+            os.path.dirname(__file__), "..", "..", "..",
+            "pyproject.toml")) as f:
+        version = toml.load(f)["tool"]["poetry"]["version"]
+    report = {
+        "version": version,
+        "python": sys.version,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "compare", "workdir")},
+        "results": {}}
+    for size in args.sizes:
+        dir_path = os.path.join(args.workdir, f"project_{size}")
+        print(f"INFO: Generating {size} files in {dir_path}")
+        make_project(
+            dir_path, size, args.depth, args.py_ratio,
+            args.todo_density, args.commits)
+        print(f"INFO: Measuring {size} files.")
+        report["results"][str(size)] = run_benchmark(
+            dir_path, args.repeat, args.skip)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"INFO: Results are written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
@@ -1,26 +1,39 @@
 import importlib
 import importlib.util
-import inspect
 import os
-import time
 import tkinter as tk
 import traceback
 
 import inflection
 import yaml
+from PyProma_common.event_bus import EventBus
+from PyProma_common.hook_profiler import HookProfiler
+from PyProma_common.hook_registry import COLLECT, REFRESH, HookRegistry
+from PyProma_common.ignore_rules import IgnoreMatcher, load_project_excludes
+from PyProma_common.plugin_host import HOST
+from PyProma_common.project_index import ProjectIndex
+from PyProma_common.result_cache import PluginCache, ResultCache
 from PyProma_common.PyProma_templates import tab_template
 
 
 class TestTab:
     def __init__(self, target: str, target_dir) -> None:
         self.target_dir = os.path.normpath(target_dir.replace("\\", "/"))
+        self.index = ProjectIndex(
+            self.target_dir,
+            IgnoreMatcher(
+                self.target_dir, load_project_excludes(self.target_dir)))
+        self.hooks = HookRegistry(HookProfiler())
+        self.results = ResultCache(":memory:")
         self.root = tk.Tk()
+        self.events = EventBus(self.root, self.hooks, self.run_refresh)
         self.root.geometry("800x575")
 
         print("INFO: Loading plugin file.")
         spec = importlib.util.spec_from_file_location("module.name", target)
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
+        self.module = module
 
         print("INFO: Loading tab class.")
         module_name = os.path.basename(target)[:-3]
@@ -30,6 +43,7 @@ class TestTab:
             if issubclass(tab_class, tab_template.TabTemplate):
                 self.tab = tab_class(self.root, self)
                 self.tab.pack()
+                self.hooks.register_plugin(tab_class_name, self.tab)
                 print(f"INFO: Tab class {tab_class_name} is loaded successly.")
                 print(
                     f"Tab Name is {getattr(self.tab, 'NAME', tab_class_name)}")
@@ -51,23 +65,52 @@ class TestTab:
         self.refresh_plugins()
         print("INFO: Showing GUI.")
         self.root.mainloop()
+        self.hooks.profiler.print_summary()
 
     def refresh_plugins(self):
         print("INFO: Refreshing GUI.")
-        for name, method in inspect.getmembers(self.tab):
-            if (
-                    inspect.ismethod(method)
-                    and hasattr(method, "__is_refresh_method__")
-                    and method.__is_refresh_method__):
-                print(f"INFO: Calling refresh method '{method.__name__}'")
-                try:
-                    start_time = time.time()
-                    method()
-                    end_time = time.time()
-                    print(f"Time taken to refresh: {end_time - start_time}")
-                except Exception:
-                    print("ERROR: An Error occured while refreshing.")
-                    traceback.print_exc()
+        for owner, method in self.hooks.items(REFRESH):
+            self.run_refresh(owner, method)
+        self.hooks.profiler.print_summary()
+
+    def run_refresh(self, owner: str, method, trigger: str = None):
+        print(f"INFO: Calling refresh method '{method.__name__}'")
+        invoke = self.hooks.invoke
+        try:
+            if collect := getattr(method, "__collect__", None):
+                data = invoke(
+                    owner, COLLECT, getattr(self.tab, collect),
+                    trigger=trigger)
+                invoke(owner, REFRESH, method, data, trigger=trigger)
+            else:
+                invoke(owner, REFRESH, method, trigger=trigger)
+        except Exception:
+            print("ERROR: An Error occured while refreshing.")
+            traceback.print_exc()
+
+    def publish(self, event: str, *args):
+        print(f"INFO: Event '{event}' was published with {args}.")
+        self.events.publish(event, *args)
+
+    def result_cache(
+            self, tab_name: str, content_hash: bool = False) -> PluginCache:
+        print(f"INFO: Result cache of '{tab_name}' was requested.")
+        return PluginCache(self.results, tab_name, "test", content_hash)
+
+    def run_batch(
+            self, tab_name: str, function_name: str, paths: list,
+            on_result, on_done=None, token=None, args: tuple = ()) -> int:
+        print(
+            f"INFO: Running '{function_name}' for {len(paths)} files "
+            "in this process.")
+        function = getattr(self.module, function_name)
+        for path in paths:
+            on_result(
+                path,
+                self.hooks.invoke(tab_name, HOST, function, path, *args))
+        if on_done is not None:
+            on_done()
+        return 0
 
     def refresh_main(self):
         print("INFO: The method 'refresh_main' was called.")
@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import threading
+import time
+
+from PyProma_common.user_cache import project_cache_path
+
+COMMIT_SIZE = 256
+
+
+def todo_index_path(dir_path: str) -> str:
+    # comments are kept in memory if there is no cache directory
+    return project_cache_path(dir_path, "todos.sqlite3") or ":memory:"
+
+
+class TodoIndex:
+    """this class stores ToDo comments of a project in an SQLite file.
+
+    each comment has its tag, file, line, text and the time it was first
+    seen. a file is stored with the key (see result_cache.file_key) it
+    was scanned for, so that only changed files are scanned again. the
+    first-seen time is kept while a comment with the same tag and text
+    stays in its file, even if its line moves.
+    """
+
+    def __init__(self, path: str):
+        """this constructor opens (or creates) the index file.
+        a broken file is replaced with an empty index.
+
+        Args:
+            path (str): path to SQLite file (":memory:" for no file)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._changes = 0
+        try:
+            self._db = self._connect(path)
+        except sqlite3.DatabaseError:
+            try:
+                os.remove(path)
+                self._db = self._connect(path)
+            except (OSError, sqlite3.DatabaseError):
+                self._db = self._connect(":memory:")
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, key TEXT)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS todos ("
+                "path TEXT, line INTEGER, tag TEXT, text TEXT, "
+                "first_seen REAL)")
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS todos_path ON todos (path)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "name TEXT PRIMARY KEY, value TEXT)")
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def set_tags(self, tags: list):
+        """this func drops comments of removed tags and forgets keys of
+        files if tags changed, so that every file is scanned again.
+
+        Args:
+            tags (list): tags such as "TODO"
+        """
+        value = " ".join(tags)
+        with self._lock:
+            if self._db is None:
+                return
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE name = 'tags'").fetchone()
+            if row is not None and row[0] == value:
+                return
+            self._db.execute(
+                "DELETE FROM todos WHERE tag NOT IN "
+                f"({', '.join('?' * len(tags))})", tuple(tags))
+            self._db.execute("DELETE FROM files")
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('tags', ?)", (value,))
+            self._db.commit()
+
+    def key(self, path: str) -> str | None:
+        with self._lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT key FROM files WHERE path = ?", (path,)).fetchone()
+        return None if row is None else row[0]
+
+    def update(
+            self, path: str, key: str, comments: list,
+            now: float = None):
+        """this func replaces comments of a file.
+
+        Args:
+            path (str): path to file
+            key (str): key of file made by file_key
+            comments (list): (tag, line number, text)
+            now (float, optional): first-seen time of new comments.
+                Defaults to None (time.time()).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._db is None:
+                return
+            first_seen = {}
+            for tag, text, seen in self._db.execute(
+                    "SELECT tag, text, first_seen FROM todos "
+                    "WHERE path = ? ORDER BY line", (path,)):
+                first_seen.setdefault((tag, text), []).append(seen)
+            rows = []
+            for tag, line_no, text in comments:
+                seen = first_seen.get((tag, text))
+                rows.append(
+                    (path, line_no, tag, text, seen.pop(0) if seen else now))
+            self._db.execute("DELETE FROM todos WHERE path = ?", (path,))
+            self._db.executemany(
+                "INSERT INTO todos VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?)", (path, key))
+            self._changed()
+
+    def remove(self, path: str):
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute("DELETE FROM todos WHERE path = ?", (path,))
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._changed()
+
+    def retain(self, paths: set):
+        """this func removes files which are not in paths.
+
+        Args:
+            paths (set): paths to files in the project
+        """
+        with self._lock:
+            if self._db is None:
+                return
+            stale = [
+                (path,) for path, in self._db.execute(
+                    "SELECT path FROM files UNION "
+                    "SELECT DISTINCT path FROM todos")
+                if path not in paths]
+            self._db.executemany("DELETE FROM todos WHERE path = ?", stale)
+            self._db.executemany("DELETE FROM files WHERE path = ?", stale)
+            self._changed()
+
+    @staticmethod
+    def _where(
+            tag: str = None, prefix: str = None, text: str = None,
+            path: str = None) -> tuple:
+        conditions = []
+        params = []
+        if path:
+            conditions.append("path = ?")
+            params.append(path)
+        if tag:
+            conditions.append("tag = ?")
+            params.append(tag)
+        if prefix:
+            conditions.append("substr(path, 1, ?) = ?")
+            params += [len(prefix), prefix]
+        if text:
+            conditions.append("instr(lower(text), ?) > 0")
+            params.append(text.lower())
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, params
+
+    def query(
+            self, tag: str = None, prefix: str = None, text: str = None,
+            path: str = None) -> list:
+        """this func finds comments in path order.
+
+        Args:
+            tag (str, optional): only this tag. Defaults to None.
+            prefix (str, optional): only paths starting with prefix.
+                Defaults to None.
+            text (str, optional): only texts containing text (case
+                insensitive). Defaults to None.
+            path (str, optional): only this file. Defaults to None.
+
+        Returns:
+            list: (path, line number, tag, text, first-seen time)
+        """
+        where, params = self._where(tag, prefix, text, path)
+        with self._lock:
+            if self._db is None:
+                return []
+            return self._db.execute(
+                "SELECT path, line, tag, text, first_seen FROM todos"
+                + where + " ORDER BY path, line", params).fetchall()
+
+    def count_tags(self, prefix: str = None, text: str = None) -> dict:
+        """this func counts comments per tag.
+
+        Args:
+            prefix (str, optional): only paths starting with prefix.
+                Defaults to None.
+            text (str, optional): only texts containing text.
+                Defaults to None.
+
+        Returns:
+            dict: tag -> number of comments
+        """
+        where, params = self._where(None, prefix, text)
+        with self._lock:
+            if self._db is None:
+                return {}
+            return dict(self._db.execute(
+                "SELECT tag, COUNT(*) FROM todos" + where + " GROUP BY tag",
+                params).fetchall())
+
+    def _changed(self):
+        self._changes += 1
+        if self._changes >= COMMIT_SIZE:
+            self._db.commit()
+            self._changes = 0
+
+    def commit(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.commit()
+                self._changes = 0
+
+    def close(self):
+        """this func writes pending changes and closes the file.
+        later calls of other methods do nothing.
+        """
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.commit()
+            except sqlite3.Error:
+                pass
+            self._db.close()
+            self._db = None
@@ -0,0 +1,200 @@
+import functools
+import json
+import re
+import tokenize
+
+json_path = "PyProma_settings.json"
+DEFAULT_TAGS = ("TODO", "BUG", "FIXME", "HACK")
+CHUNK_SIZE = 1 << 20
+# text files whose comments start with "#" like .py files
+TEXT_SUFFIXES = (
+    ".pyi", ".pyw", ".toml", ".cfg", ".ini", ".yaml", ".yml", ".sh",
+    ".txt")
+
+
+def _read_settings() -> dict:
+    try:
+        with open(json_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_setting(key: str, value):
+    settings = _read_settings()
+    settings[key] = value
+    with open(json_path, "w") as f:
+        json.dump(settings, f, indent=4)
+
+
+def load_todo_tags() -> list:
+    """this func reads ToDo tags in settings.
+
+    Returns:
+        list: tags (DEFAULT_TAGS if they are not set)
+    """
+    return _read_settings().get("todo_tags") or list(DEFAULT_TAGS)
+
+
+def save_todo_tags(tags: list):
+    """this func writes ToDo tags to settings.
+
+    Args:
+        tags (list): tags such as "TODO"
+    """
+    _write_setting("todo_tags", tags)
+
+
+def load_todo_text_files() -> bool:
+    """this func reads whether text files in TEXT_SUFFIXES are scanned.
+
+    Returns:
+        bool: True if they are scanned (False if it is not set)
+    """
+    return bool(_read_settings().get("todo_text_files", False))
+
+
+def save_todo_text_files(enabled: bool):
+    _write_setting("todo_text_files", enabled)
+
+
+def compile_tags(tags=DEFAULT_TAGS) -> re.Pattern:
+    """this func compiles one pattern which matches a comment starting
+    with any of tags, followed by a space or the end of line.
+
+    Args:
+        tags (iterable, optional): tags. Defaults to DEFAULT_TAGS.
+
+    Returns:
+        re.Pattern: bytes pattern matched at "#". group 1 is the tag and
+            group 2 the text (None for an empty text).
+    """
+    alternation = b"|".join(
+        re.escape(tag.encode("utf-8"))
+        for tag in sorted(set(tags), key=len, reverse=True))
+    return re.compile(
+        rb"#[ \t]*(" + alternation + rb")(?:[ \t]+([^\r\n]*)|[ \t]*\r?$)",
+        re.MULTILINE)
+
+
+def scan_stream(f, pattern: re.Pattern):
+    """this func finds ToDo comments in a binary stream.
+    the stream is read in chunks of CHUNK_SIZE, so memory doesn't grow
+    with its size. only "#" in each line is tried with pattern, and the
+    first match of a line is reported.
+
+    Args:
+        f (BinaryIO): stream opened in binary mode
+        pattern (re.Pattern): pattern made by compile_tags
+
+    Yields:
+        tuple: (tag, line number, text)
+    """
+    line_no = 1
+    buffer = b""
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if chunk:
+            buffer += chunk
+            end = buffer.rfind(b"\n") + 1
+            if end == 0:
+                continue
+        else:
+            end = len(buffer)
+        position = 0
+        counted = 0
+        while (position := buffer.find(b"#", position, end)) != -1:
+            line_end = buffer.find(b"\n", position, end)
+            line_end = end if line_end == -1 else line_end
+            match = pattern.match(buffer, position, line_end)
+            if match is None:
+                position += 1
+                continue
+            line_no += buffer.count(b"\n", counted, position)
+            counted = position
+            tag, text = match.groups()
+            yield (
+                tag.decode("utf-8"), line_no,
+                (text or b"").decode("utf-8", "replace").rstrip())
+            position = line_end
+        line_no += buffer.count(b"\n", counted, end)
+        buffer = buffer[end:]
+        if not chunk:
+            return
+
+
+def scan_file(path: str, pattern: re.Pattern = None) -> list:
+    """this func finds ToDo comments in a file.
+
+    Args:
+        path (str): path to file
+        pattern (re.Pattern, optional): pattern made by compile_tags.
+            Defaults to None (DEFAULT_TAGS).
+
+    Returns:
+        list: (tag, line number, text). empty if file can't be read.
+    """
+    if pattern is None:
+        pattern = compile_tags()
+    try:
+        with open(path, "rb") as f:
+            return list(scan_stream(f, pattern))
+    except OSError:
+        return []
+
+
+def scan_comments(path: str, pattern: re.Pattern = None) -> list:
+    """this func finds ToDo comments in a .py file with tokenize, so
+    that tags in strings and docstrings are not reported.
+    files without any match in scan_file are not tokenized. a file which
+    can't be tokenized (e.g. a syntax error) falls back to scan_file.
+
+    Args:
+        path (str): path to .py file
+        pattern (re.Pattern, optional): pattern made by compile_tags.
+            Defaults to None (DEFAULT_TAGS).
+
+    Returns:
+        list: (tag, line number, text). empty if file can't be read.
+    """
+    if pattern is None:
+        pattern = compile_tags()
+    if not (candidates := scan_file(path, pattern)):
+        return []
+    comments = []
+    try:
+        with open(path, "rb") as f:
+            for token in tokenize.tokenize(f.readline):
+                if token.type != tokenize.COMMENT:
+                    continue
+                match = pattern.search(token.string.encode("utf-8"))
+                if match is not None:
+                    tag, text = match.groups()
+                    comments.append((
+                        tag.decode("utf-8"), token.start[0],
+                        (text or b"").decode("utf-8", "replace").rstrip()))
+    except (OSError, SyntaxError, UnicodeDecodeError, tokenize.TokenError):
+        return candidates
+    return comments
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled(tags: tuple) -> re.Pattern:
+    return compile_tags(tags)
+
+
+def scan_todo(path: str, tags: tuple = DEFAULT_TAGS) -> list:
+    """this func finds ToDo comments in a .py file with scan_comments or
+    in another text file with scan_file. it is picklable, so it can run
+    in other processes.
+
+    Args:
+        path (str): path to file
+        tags (tuple, optional): tags. Defaults to DEFAULT_TAGS.
+
+    Returns:
+        list: (tag, line number, text)
+    """
+    if path.endswith(".py"):
+        return scan_comments(path, _compiled(tuple(tags)))
+    return scan_file(path, _compiled(tuple(tags)))
@@ -0,0 +1,43 @@
+import hashlib
+import os
+
+
+def cache_dir() -> str | None:
+    """this func makes (if needed) and returns PyProma's cache directory.
+
+    Returns:
+        str | None: path to cache directory or None if it can't be made
+    """
+    match os.name:
+        case "nt":
+            base = os.environ.get(
+                "LOCALAPPDATA", os.path.expanduser("~"))
+        case _:
+            base = os.environ.get(
+                "XDG_CACHE_HOME",
+                os.path.join(os.path.expanduser("~"), ".cache"))
+    path = os.path.join(base, "PyProma")
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def project_cache_path(dir_path: str, name: str) -> str | None:
+    """this func makes path to a cache file of project.
+
+    Args:
+        dir_path (str): path to project directory
+        name (str): name of cache file
+
+    Returns:
+        str | None: path to cache file or None if there is no cache
+            directory (caching is disabled)
+    """
+    if (directory := cache_dir()) is None:
+        return None
+    key = os.path.normcase(os.path.abspath(dir_path))
+    digest = hashlib.sha1(
+        key.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(directory, f"{digest}-{name}")
@@ -1,15 +1,27 @@
+import json
 import os
+import queue
 import subprocess
 import tkinter as tk
 import tkinter.ttk as ttk
+from collections import deque
 from pathlib import Path
 from textwrap import dedent
 from tkinter import filedialog, messagebox
 
 import pyperclip
 import send2trash
+from PyProma_common import (
+    dir_scanner, dir_stats, fs_watcher, ignore_rules, scan_cache)
+from PyProma_common.dir_scanner import DirScanner
+from PyProma_common.dir_stats import DirStats
+from PyProma_common.event_bus import (
+    FILES_CHANGED, GIT_HEAD_CHANGED, SETTINGS_CHANGED)
+from PyProma_common.fuzzy_finder import FuzzyFinder
+from PyProma_common.project_index import KIND_REMOVED
 from PyProma_common.show_version import ShowVersion
 from PyProma_dir_view.plugins import plugin_manager
+from PyProma_dir_view.quick_open import QuickOpen
 
 # IDEA Add builder function. e.g. pyinstaller, nuitka.
 # IDEA Add Poetry support.
@@ -18,21 +30,44 @@ from PyProma_dir_view.plugins import plugin_manager
 # IDEA divide this repository into main repository and plugins repository.
 
 
-class DirView(tk.Tk):
+class DirView(tk.Toplevel):
+    WATCH_INTERVAL = 500
+    SCAN_BATCH = 500
 
-    def __init__(self, project_name: str = "", dir_path: str = ""):
+    def __init__(
+            self, project_name: str = "", dir_path: str = "",
+            lazy_tree: bool = True, watch_files: bool = True,
+            stats_columns: bool = False, master: tk.Tk = None,
+            on_back=None):
         """this constructor sets dir_path and create GUI.
 
         Args:
             project_name (str, optional): project name. Defaults to "".
             dir_path (str, optional): path to directory. Defaults to "".
+            lazy_tree (bool, optional): fill directories only when opened.
+                Defaults to True.
+            watch_files (bool, optional): apply file changes to trees
+                without rebuilding them. Defaults to True.
+            stats_columns (bool, optional): show size, file count and
+                line count of entries. Defaults to False.
+            master (tk.Tk, optional): root of the application.
+                Defaults to None (a hidden root is made and its main loop
+                runs until this window is closed).
+            on_back (callable, optional): called when the project is
+                closed to go back to the project list.
+                Defaults to None (closing the window quits).
         """
-        super().__init__()
+        standalone = master is None
+        if standalone:
+            master = tk.Tk()
+            master.withdraw()
+        super().__init__(master)
         self.geometry("1000x600")
-        title = (
-            "Python project manager"
-            + (f" - {project_name}" if project_name else ""))
-        self.title(title)
+        self.set_title(project_name)
+        self.on_back = on_back
+        self.protocol(
+            "WM_DELETE_WINDOW",
+            self.back if on_back is not None else master.destroy)
 
         self.dir_path = (
             os.path.normpath(dir_path.replace("\\", "/"))
@@ -43,6 +78,39 @@ class DirView(tk.Tk):
         self.main_menu.add_cascade(label="File", menu=self.file_menu)
         self.file_menu.add_command(
             label="Open directory", command=self.set_dir_path)
+        self.file_menu.add_command(
+            label="Exclude patterns", command=self.edit_excludes)
+        if on_back is not None:
+            self.file_menu.add_command(
+                label="Back to projects", command=self.back)
+        self.lazy_tree = tk.BooleanVar(self, value=lazy_tree)
+        self.view_menu = tk.Menu(self.main_menu, tearoff=False)
+        self.main_menu.add_cascade(label="View", menu=self.view_menu)
+        self.view_menu.add_checkbutton(
+            label="Lazy directory tree",
+            variable=self.lazy_tree,
+            command=self.refresh_trees)
+        self.watch_files = tk.BooleanVar(self, value=watch_files)
+        self.watcher = None
+        self.ignore = None
+        self.scanner = None
+        self.scan_fingerprint = ""
+        self.finder = FuzzyFinder()
+        self.view_menu.add_checkbutton(
+            label="Watch file changes",
+            variable=self.watch_files,
+            command=self.start_watcher)
+        self.stats_columns = tk.BooleanVar(self, value=stats_columns)
+        self.stats = None
+        self.line_cache = {}
+        self.stats_pending = deque()
+        self.view_menu.add_checkbutton(
+            label="Size columns",
+            variable=self.stats_columns,
+            command=self.toggle_stats)
+        self.view_menu.add_command(
+            label="Quick open", accelerator="Ctrl+P",
+            command=self.quick_open)
         self.help_menu = tk.Menu(self.main_menu, tearoff=False)
         self.main_menu.add_cascade(label="Help", menu=self.help_menu)
         self.help_menu.add_command(
@@ -51,12 +119,18 @@ class DirView(tk.Tk):
 
         self.dir_frame = tk.Frame(self, width=200, height=600)
         self.dir_frame.propagate(False)
-        self.dir_tree = ttk.Treeview(self.dir_frame, show=["tree", "headings"])
+        self.dir_tree = ttk.Treeview(
+            self.dir_frame, show=["tree", "headings"],
+            columns=("size", "files", "lines"), displaycolumns=())
         self.dir_tree.heading(
             "#0",
             text="directory",
             anchor=tk.CENTER,
             command=lambda: self.open_directory(self.dir_path))
+        for column in ("size", "files", "lines"):
+            self.dir_tree.heading(column, text=column)
+            self.dir_tree.column(
+                column, width=70, stretch=False, anchor=tk.E)
         self.dir_menu = tk.Menu(self.dir_frame, tearoff=False)
         self.dir_menu.add_command(
             label="Open File",
@@ -79,7 +153,14 @@ class DirView(tk.Tk):
                 self.open_directory(self.dir_tree.selection()[0])
                 if self.dir_tree.selection()
                 else None))
+        self.dir_tree.bind("<<TreeviewOpen>>", self.dir_tree_on_open)
         self.dir_tree.pack(fill=tk.BOTH, expand=True)
+        self.scan_frame = tk.Frame(self.dir_frame)
+        self.scan_label = tk.Label(self.scan_frame, text="Scanning...")
+        self.scan_label.pack(anchor=tk.W)
+        self.scan_progress = ttk.Progressbar(
+            self.scan_frame, mode="indeterminate")
+        self.scan_progress.pack(fill=tk.X)
         self.dir_frame.grid(row=0, column=0, sticky=tk.NSEW)
 
         self.tab_frame = tk.Frame(self, width=800, height=600)
@@ -89,9 +170,64 @@ class DirView(tk.Tk):
         self.tab.enable_traversal()
         self.tab.pack(anchor=tk.NW)
         self.plugins = plugin_manager.PluginManager(self)
+        events = self.plugins.events
+        for event, callback in (
+                (FILES_CHANGED, self.on_files_changed),
+                (GIT_HEAD_CHANGED, self.on_git_head_changed),
+                (SETTINGS_CHANGED, self.on_settings_changed)):
+            events.subscribe(event, callback, -1, "DirView")
         self.bind("<Control-r>", lambda event: self.refresh_trees())
-        self.refresh_trees()
-        self.mainloop()
+        self.bind("<Control-p>", lambda event: self.quick_open())
+        self.refresh_trees(use_cache=True)
+        self.toggle_stats()
+        self.after(self.WATCH_INTERVAL, self.apply_file_changes)
+        if standalone:
+            self.mainloop()
+
+    def set_title(self, project_name: str):
+        self.title(
+            "Python project manager"
+            + (f" - {project_name}" if project_name else ""))
+
+    def open_project(self, project_name: str, dir_path: str):
+        """this func shows another project in this window.
+        loaded plugins are kept and refreshed for the new dir_path.
+
+        Args:
+            project_name (str): project name
+            dir_path (str): path to directory
+        """
+        self.close_project()
+        self.set_title(project_name)
+        self.dir_path = (
+            os.path.normpath(dir_path.replace("\\", "/"))
+            if os.path.isdir(dir_path) else "")
+        self.deiconify()
+        self.refresh_trees(use_cache=True)
+
+    def close_project(self):
+        """this func stops scanning, watching and background work of
+        plugins on dir_path, and saves the scan cache.
+        """
+        if self.stats is not None:
+            self.stats.cancel()
+            self.stats = None
+        if self.scanner is not None:
+            self.scanner.cancel()
+            self.scanner = None
+        elif os.path.isdir(self.dir_path):
+            scan_cache.save_index(self.plugins.index, self.scan_fingerprint)
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.plugins.new_generation()
+
+    def back(self):
+        """this func closes the project and shows the project list.
+        """
+        self.close_project()
+        self.withdraw()
+        self.on_back()
 
     def set_dir_path(self):
         """this func asks directory and sets dir_path.
@@ -103,46 +239,509 @@ class DirView(tk.Tk):
             self.dir_path = path
             self.refresh_trees()
 
-    def refresh_trees(self):
-        """this func initialize tree.
+    def refresh_trees(self, use_cache: bool = False):
+        """this func initialize tree and starts scanning dir_path.
+        a running scan is cancelled.
         after this func
-        -> make_dir_tree(dir_path)
+        -> insert_scanned_nodes() until the scan is finished
+        -> plugins.run_pyfile_plugins()
+
+        Args:
+            use_cache (bool, optional): render the last scan saved in
+                scan cache and list again only changed directories.
+                Defaults to False.
         """
         if os.path.isdir(self.dir_path):
+            if self.scanner is not None:
+                self.scanner.cancel()
+            if self.watcher is not None:
+                self.watcher.stop()
+                self.watcher = None
+            if self.stats is not None:
+                self.stats.cancel()
+                self.stats = None
+            self.line_cache = dir_stats.load_line_cache(self.dir_path)
             self.plugins.refresh_plugins()
+            excludes = ignore_rules.load_project_excludes(self.dir_path)
+            self.ignore = ignore_rules.IgnoreMatcher(self.dir_path, excludes)
+            self.scan_fingerprint = json.dumps(
+                [ignore_rules.DEFAULT_EXCLUDES, excludes])
             self.dir_tree.delete(*self.dir_tree.get_children())
             self.dir_tree.heading(
                 "#0",
                 text=os.path.basename(self.dir_path),
                 anchor=tk.CENTER,
                 command=lambda: self.open_directory(self.dir_path))
-            self.make_dir_tree(self.dir_path)
+            cached = (
+                scan_cache.load_index(
+                    self.dir_path, self.scan_fingerprint, self.ignore)
+                if use_cache else None)
+            self.scanner = DirScanner(self.dir_path, self.ignore, cached)
+            self.plugins.index = self.scanner.index
+            self.plugins.scanning = True
+            self.finder.clear()
+            self.scan_paths = {0: self.dir_path}
+            self.scan_pending = deque()
+            self.scan_label["text"] = "Scanning..."
+            self.scan_frame.pack(
+                side=tk.BOTTOM, fill=tk.X, before=self.dir_tree)
+            self.scan_progress.start()
+            self.scanner.start()
+            self.after(1, self.insert_scanned_nodes, self.scanner)
+
+    def insert_scanned_nodes(self, scanner: DirScanner):
+        """this func inserts at most SCAN_BATCH scanned entries into
+        dir_tree and calls itself until the scan is finished.
+        in lazy mode only the top level is inserted.
+
+        Args:
+            scanner (DirScanner): scanner which this call belongs to
+        """
+        if scanner is not self.scanner:
+            return
+        index = scanner.index
+        lazy = self.lazy_tree.get()
+        inserted = 0
+        for _ in range(self.SCAN_BATCH * 20):
+            if inserted >= self.SCAN_BATCH:
+                break
+            if not self.scan_pending:
+                try:
+                    item = scanner.entries.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.finish_scan()
+                    return
+                kind, value = item
+                if kind == dir_scanner.CHANGES:
+                    self.apply_changes(
+                        fs_watcher.coalesce(value), notify=False)
+                    continue
+                self.scan_pending.extend(value)
+            child = self.scan_pending.popleft()
+            parent = index.parents[child]
+            if lazy and parent != 0:
+                continue
+            path = os.path.join(self.scan_paths[parent], index.names[child])
+            self.dir_tree.insert(
+                self.scan_paths[parent] if parent else "", tk.END,
+                iid=path, text=index.names[child])
+            if index.is_dir(child):
+                if lazy:
+                    self.dir_tree.insert(
+                        path, tk.END, text="", tags=("placeholder",))
+                else:
+                    self.scan_paths[child] = path
+            inserted += 1
+        self.scan_label["text"] = f"Scanning... {len(index)} entries"
+        self.after(1, self.insert_scanned_nodes, scanner)
 
-    def make_dir_tree(self, path: str, parent_tree: str = None):
-        """this func makes directory tree.
+    def finish_scan(self):
+        """this func hides progress, fills finder and passes .py files
+        to plugins.
+        after this func -> start_watcher() -> start_stats()
+        """
+        self.scan_progress.stop()
+        self.scan_frame.pack_forget()
+        self.scan_paths = {}
+        self.scanner = None
+        self.plugins.scanning = False
+        scan_cache.save_index(self.plugins.index, self.scan_fingerprint)
+        prefix = len(os.path.join(self.dir_path, ""))
+        self.finder = FuzzyFinder(
+            path[prefix:] for path in self.plugins.index.iter_files())
+        self.plugins.run_pyfile_plugins()
+        self.start_watcher()
+        self.start_stats()
+
+    def start_watcher(self):
+        """this func (re)starts watching dir_path if watch_files is set.
+        """
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self.watch_files.get() and os.path.isdir(self.dir_path):
+            index = self.plugins.index
+            dirs = [
+                index.path(i) for i in range(len(index)) if index.is_dir(i)]
+            git_path = os.path.join(self.dir_path, ".git")
+            refs_path = os.path.join(git_path, "refs")
+            self.watcher = fs_watcher.create_watcher(
+                self.dir_path, dirs, self.ignore,
+                [git_path] if os.path.isdir(git_path) else [],
+                [refs_path] if os.path.isdir(refs_path) else [])
+            self.watcher.start()
+
+    def apply_file_changes(self):
+        """this func applies batched file changes from watcher to
+        plugins.index and dir_tree, and notifies plugins.
+        this func calls itself every WATCH_INTERVAL ms.
+        """
+        if self.watcher is not None:
+            changes = self.watcher.get_changes()
+            if changes.get("") == fs_watcher.RESCAN:
+                self.refresh_trees()
+            elif changes:
+                self.apply_changes(changes)
+        self.after(self.WATCH_INTERVAL, self.apply_file_changes)
+
+    def apply_changes(
+            self, changes: dict, notify: bool = True, publish: bool = True):
+        """this func applies file changes to plugins.index, dir_tree and
+        finder.
+
+        Args:
+            changes (dict): path -> kind (see fs_watcher.coalesce)
+            notify (bool, optional): notify plugins of changed files.
+                Defaults to True.
+            publish (bool, optional): publish FILES_CHANGED when plugins
+                are notified. Defaults to True.
+        """
+        index = self.plugins.index
+        git_path = os.path.join(self.dir_path, ".git") + os.sep
+        changed, removed = [], []
+        for path, kind in sorted(changes.items()):
+            if path.startswith(git_path):
+                # .git is watched but not indexed. git writes files
+                # through *.lock files which it renames.
+                if path.endswith(".lock"):
+                    continue
+                if kind == fs_watcher.DELETED:
+                    removed.append(path)
+                else:
+                    changed.append(path)
+            elif kind == fs_watcher.DELETED:
+                files = index.remove(path)
+                removed.extend(files)
+                for file in files:
+                    self.finder.remove(os.path.relpath(file, self.dir_path))
+                if self.node_of(path):
+                    self.dir_tree.delete(path)
+            elif kind == fs_watcher.CREATED and index.find(path) == -1:
+                files = index.add(path)
+                changed.extend(files)
+                for file in files:
+                    self.finder.add(os.path.relpath(file, self.dir_path))
+                self.insert_dir_node(path)
+            elif index.find(path) != -1:
+                # a file replaced by os.replace (atomic save) is created
+                # again, so it is a modification of the indexed file.
+                # ignored paths are not indexed and never reach plugins.
+                index.update(path)
+                changed.append(path)
+        # files in a created directory are reported by index.add and
+        # by their own events.
+        changed = list(dict.fromkeys(changed))
+        if notify:
+            self.plugins.notify_changes(changed, removed, publish)
+            self.start_stats()
+
+    def on_files_changed(self, paths: list):
+        """this func applies files changed by plugins while the watcher
+        is off. the watcher reports them by itself.
+
+        Args:
+            paths (list): absolute paths
+        """
+        if (
+                self.watcher is not None
+                or self.scanner is not None
+                or not os.path.isdir(self.dir_path)):
+            return
+        index = self.plugins.index
+        changes = {}
+        for path in map(os.path.normpath, paths):
+            if os.path.relpath(path, self.dir_path).startswith(".."):
+                continue
+            if not os.path.exists(path):
+                changes[path] = fs_watcher.DELETED
+            elif index.find(path) == -1:
+                changes[path] = fs_watcher.CREATED
+            else:
+                changes[path] = fs_watcher.MODIFIED
+        self.apply_changes(changes, publish=False)
+
+    def on_git_head_changed(self):
+        """this func reloads trees after a checkout while the watcher is
+        off. the watcher reports changed files by itself.
+        """
+        if self.watcher is None:
+            self.refresh_trees(use_cache=True)
+
+    def on_settings_changed(self, name: str):
+        if name == "excludes":
+            self.refresh_trees()
+
+    def toggle_stats(self):
+        """this func shows or hides size columns of dir_tree.
+        """
+        if self.stats_columns.get():
+            self.dir_tree["displaycolumns"] = ("size", "files", "lines")
+            self.dir_frame["width"] = 410
+            self.start_stats()
+        else:
+            self.dir_tree["displaycolumns"] = ()
+            self.dir_frame["width"] = 200
+            if self.stats is not None:
+                self.stats.cancel()
+                self.stats = None
+
+    def start_stats(self):
+        """this func (re)starts computing size columns of the finished
+        index if they are shown.
+        after this func -> apply_stats() until they are computed
+        """
+        if (
+                not self.stats_columns.get()
+                or self.scanner is not None
+                or not os.path.isdir(self.dir_path)):
+            return
+        if self.stats is not None:
+            self.stats.cancel()
+        self.stats = DirStats(self.plugins.index, dict(self.line_cache))
+        self.stats_pending = deque()
+        self.stats.start()
+        self.after(1, self.apply_stats, self.stats)
+
+    def apply_stats(self, stats: DirStats):
+        """this func sets computed values of at most SCAN_BATCH shown
+        nodes and calls itself until stats is finished.
+
+        Args:
+            stats (DirStats): stats which this call belongs to
+        """
+        if stats is not self.stats:
+            return
+        index = stats.index
+        updated = 0
+        for _ in range(self.SCAN_BATCH * 20):
+            if updated >= self.SCAN_BATCH:
+                break
+            if not self.stats_pending:
+                try:
+                    entries = stats.results.get_nowait()
+                except queue.Empty:
+                    break
+                if entries is None:
+                    self.line_cache = stats.cache
+                    dir_stats.save_line_cache(self.dir_path, stats.cache)
+                    return
+                self.stats_pending.extend(entries)
+                continue
+            entry = self.stats_pending.popleft()
+            if entry == 0 or index.kinds[entry] == KIND_REMOVED:
+                continue
+            path = index.path(entry)
+            if self.dir_tree.exists(path):
+                self.dir_tree.item(path, values=stats.values(entry))
+                updated += 1
+        self.after(1, self.apply_stats, stats)
+
+    def node_values(self, entry: int) -> tuple:
+        """this func makes size column values of index entry.
+
+        Args:
+            entry (int): index of entry
+
+        Returns:
+            tuple: values of size columns ("" if not computed)
+        """
+        if self.stats is None or self.stats.index is not self.plugins.index:
+            return ("", "", "")
+        return self.stats.values(entry)
+
+    def insert_dir_node(self, path: str):
+        """this func inserts indexed path into dir_tree if its parent
+        node is shown and filled.
+
+        Args:
+            path (str): absolute path
+        """
+        index = self.plugins.index
+        parent_node = self.node_of(os.path.dirname(path))
+        if (
+                parent_node is None
+                or self.node_of(path) is not None
+                or (entry := index.find(path)) == -1):
+            return
+        children = self.dir_tree.get_children(parent_node)
+        if (
+                len(children) == 1
+                and "placeholder" in self.dir_tree.item(children[0], "tags")):
+            return
+        self.dir_tree.insert(
+            parent_node, tk.END, iid=path, text=index.names[entry],
+            values=self.node_values(entry))
+        if index.is_dir(entry):
+            if self.lazy_tree.get():
+                self.dir_tree.insert(
+                    path, tk.END, text="", tags=("placeholder",))
+            else:
+                self.make_dir_tree(path, path, entry)
+
+    def node_of(self, path: str) -> str | None:
+        """this func finds treeview node of path.
+        nodes use their absolute path as iid.
+
+        Args:
+            path (str): absolute path
+
+        Returns:
+            str | None: node ("" for dir_path) or None if it is not shown
+        """
+        path = os.path.normpath(path)
+        if path == self.dir_path:
+            return ""
+        return path if self.dir_tree.exists(path) else None
+
+    def path_of(self, node: str) -> str:
+        """this func makes absolute path from treeview node.
+
+        Args:
+            node (str): node ("" for dir_path)
+
+        Returns:
+            str: absolute path
+        """
+        return node if node else self.dir_path
+
+    def reveal_path(self, path: str):
+        """this func opens ancestors of path and selects its node.
+
+        Args:
+            path (str): absolute path
+        """
+        relpath = os.path.relpath(os.path.normpath(path), self.dir_path)
+        if relpath == "." or relpath.startswith(".."):
+            return
+        ancestor = self.dir_path
+        for part in relpath.split(os.sep)[:-1]:
+            ancestor = os.path.join(ancestor, part)
+            if not self.dir_tree.exists(ancestor):
+                return
+            self.fill_opened_node(ancestor)
+            self.dir_tree.item(ancestor, open=True)
+        path = os.path.join(ancestor, os.path.basename(path))
+        if self.dir_tree.exists(path):
+            self.dir_tree.see(path)
+            self.dir_tree.selection_set(path)
+            self.dir_tree.focus(path)
+
+    def quick_open(self):
+        """this func makes a box to find a file by fuzzy query.
+        Enter reveals the chosen file in dir_tree.
+        """
+        if os.path.isdir(self.dir_path):
+            QuickOpen(self)
+
+    def edit_excludes(self):
+        """this func makes a window to edit exclude patterns of dir_path.
+        patterns use .gitignore syntax and are saved to settings.
+        """
+        if not os.path.isdir(self.dir_path):
+            return
+        excludes_window = tk.Toplevel(self)
+        excludes_window.title("Exclude patterns")
+        label = tk.Label(
+            excludes_window,
+            text="One .gitignore pattern per line (e.g. build/, *.log)")
+        label.pack(anchor=tk.W)
+        text = tk.Text(excludes_window, width=50, height=15)
+        text.insert(
+            tk.END,
+            "\n".join(ignore_rules.load_project_excludes(self.dir_path)))
+        text.pack(fill=tk.BOTH, expand=True)
+
+        def save():
+            excludes = [
+                line.strip() for line in text.get(1., tk.END).splitlines()
+                if line.strip()]
+            ignore_rules.save_project_excludes(self.dir_path, excludes)
+            excludes_window.destroy()
+            self.plugins.publish(SETTINGS_CHANGED, "excludes")
+
+        button = tk.Button(excludes_window, text="save", command=save)
+        button.pack(anchor=tk.E)
+
+    def destroy(self):
+        self.close_project()
+        self.plugins.close()
+        super().destroy()
+
+    def make_dir_tree(
+            self, path: str, parent_tree: str = None, node: int = None):
+        """this func makes directory tree from plugins.index.
 
         Args:
             path (str): path which you want to make tree from
             parent_tree (str, optional): parent tree. Defaults to None.
+            node (int, optional): index of path. Defaults to None
+                (found from path).
         """
-        if os.path.exists(path):
-            dirs = os.listdir(path)
-            for directory in dirs:
-                full_path = os.path.join(path, directory)
-                full_path = os.path.normpath(full_path)
-                if os.path.isfile(full_path):
+        index = self.plugins.index
+        if node is None:
+            node = index.find(path)
+        if node != -1:
+            for child in index.children(node):
+                child_path = os.path.join(path, index.names[child])
+                self.dir_tree.insert(
+                    "" if parent_tree is None else parent_tree,
+                    tk.END,
+                    iid=child_path,
+                    text=index.names[child],
+                    values=self.node_values(child))
+                if index.is_dir(child):
+                    self.make_dir_tree(child_path, child_path, child)
+
+    def fill_dir_node(self, path: str, parent_tree: str = ""):
+        """this func inserts only direct children of path into dir_tree.
+        directories get a placeholder child and are filled when opened.
+
+        Args:
+            path (str): path to directory
+            parent_tree (str, optional): parent tree. Defaults to "".
+        """
+        index = self.plugins.index
+        if (node := index.find(path)) != -1:
+            for child in index.children(node):
+                child_path = os.path.join(path, index.names[child])
+                self.dir_tree.insert(
+                    parent_tree, tk.END,
+                    iid=child_path, text=index.names[child],
+                    values=self.node_values(child))
+                if index.is_dir(child):
                     self.dir_tree.insert(
-                        "" if parent_tree is None else parent_tree,
-                        tk.END,
-                        text=directory)
-                    if os.path.splitext(full_path)[1] == ".py":
-                        self.plugins.run_pyfile_plugin(full_path)
-                else:
-                    child = self.dir_tree.insert(
-                        "" if parent_tree is None else parent_tree,
-                        tk.END,
-                        text=directory)
-                    self.make_dir_tree(full_path, child)
+                        child_path, tk.END, text="", tags=("placeholder",))
+
+    def dir_tree_on_open(self, _: tk.Event):
+        """this func fills opened directory node if it is not filled yet.
+
+        Args:
+            _ (tk.Event): tk.Event(ignored)
+        """
+        self.fill_opened_node(self.dir_tree.focus())
+
+    def fill_opened_node(self, node: str):
+        """this func replaces placeholder of node with its children.
+        if the directory is not scanned yet, this func waits for it.
+
+        Args:
+            node (str): opened node
+        """
+        if not self.dir_tree.exists(node):
+            return
+        children = self.dir_tree.get_children(node)
+        if (
+                len(children) == 1
+                and "placeholder" in self.dir_tree.item(children[0], "tags")):
+            path = self.path_of(node)
+            index = self.plugins.index
+            if not index.is_scanned(index.find(path)):
+                self.after(100, self.fill_opened_node, node)
+                return
+            self.dir_tree.delete(children[0])
+            self.fill_dir_node(path, node)
 
     def getpath(self, target_path: str) -> str:
         """this func generates path from treeview node.
@@ -154,13 +753,9 @@ class DirView(tk.Tk):
             string: path in tree
         """
         if target_path:
-            path_list = []
-            item_id = self.dir_tree.parent(target_path)
-            while item_id:
-                path_list.insert(0, self.dir_tree.item(item_id, "text"))
-                item_id = self.dir_tree.parent(item_id)
-            path = "/".join(path_list)
-            return path
+            path = os.path.relpath(
+                os.path.dirname(self.path_of(target_path)), self.dir_path)
+            return "" if path == "." else path
 
     def open_directory(self, target_path: str):
         """this func opens selected file or directory in explorer.
@@ -168,14 +763,7 @@ class DirView(tk.Tk):
         Args:
             target_path (string): target node
         """
-        path = target_path
-        if path != self.dir_path:
-            if path:
-                path = os.path.join(
-                    self.dir_path,
-                    self.getpath(target_path),
-                    self.dir_tree.item(target_path, "text"))
-        path = os.path.normpath(path)
+        path = os.path.normpath(target_path)
         subprocess.Popen(
             ["explorer", f"/select,{path}"] if target_path else ["explorer"],
             shell=False)
@@ -187,11 +775,7 @@ class DirView(tk.Tk):
             target_path (string): target node
         """
         if target_path:
-            path = os.path.join(
-                self.dir_path,
-                self.getpath(target_path),
-                self.dir_tree.item(target_path, "text"))
-            path = os.path.normpath(path)
+            path = self.path_of(target_path)
             message = f"""\
             Move {path} to trash?
             """
@@ -215,12 +799,7 @@ class DirView(tk.Tk):
             target_path (str): target node
         """
         if target_path:
-            path = os.path.join(
-                self.dir_path,
-                self.getpath(target_path),
-                self.dir_tree.item(target_path, "text"))
-            path = os.path.normpath(path)
-            pyperclip.copy(path)
+            pyperclip.copy(self.path_of(target_path))
 
     def copy_relative_path(self, target_path: str):
         """this func copies relative path.
@@ -229,11 +808,8 @@ class DirView(tk.Tk):
             target_path (str): target node
         """
         if target_path:
-            path = os.path.join(
-                self.getpath(target_path),
-                self.dir_tree.item(target_path, "text"))
-            path = os.path.normpath(path)
-            pyperclip.copy(path)
+            pyperclip.copy(
+                os.path.relpath(self.path_of(target_path), self.dir_path))
 
     def dir_menu_on_right_click(self, event: tk.Event):
         """this func shows right-clicked menu.
@@ -1,12 +1,13 @@
 """
 name: Git
-version: "1.0.0"
+version: "1.2.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Tab Menu
 description: Supports Git operations.
 dependencies:
     - gitpython: "3.1.43"
 settings: null
+refresh: concurrent
 """
 
 import os
@@ -16,12 +17,14 @@ from textwrap import dedent
 from tkinter import messagebox
 
 import git
+from PyProma_common.event_bus import GIT_HEAD_CHANGED
 from PyProma_common.PyProma_templates import tab_template
 from PyProma_dir_view.plugins.plugin_manager import RefreshMethod
 
 
 class GitTab(tab_template.TabTemplate):
     NAME = "Git"
+    WATCH_PATTERNS = (".git/index",)
 
     def __init__(self, master=None, main=None):
         super().__init__(master, main)
@@ -78,8 +81,42 @@ class GitTab(tab_template.TabTemplate):
         self.commit_button.place(x=250, y=535)
         self.git_staging_frame.grid(row=0, column=1)
 
-    @RefreshMethod
-    def refresh(self):
+    def collect_status(self) -> dict | None:
+        """this func reads commits, diffs and branches of dir_path.
+        this runs in a worker thread, so it must not touch widgets.
+
+        Returns:
+            dict | None: status or None if dir_path is not a git
+                repository
+        """
+        git_path = os.path.join(self.main.dir_path, ".git")
+        if not os.path.isdir(git_path):
+            return None
+        repo = git.Repo(git_path)
+        return {
+            "commits": [
+                (
+                    commit.hexsha,
+                    commit.author.name,
+                    commit.authored_datetime,
+                    commit.message)
+                for commit in repo.iter_commits()],
+            "unstaged": [
+                (diff.a_path, diff.change_type)
+                for diff in repo.index.diff(None)],
+            "staged": [
+                (diff.a_path, diff.change_type)
+                for diff in repo.index.diff("HEAD")],
+            "branches": [branch.name for branch in repo.branches],
+            "active_branch": repo.active_branch.name}
+
+    @RefreshMethod(collect="collect_status", events=(GIT_HEAD_CHANGED,))
+    def refresh(self, status: dict | None):
+        """this func shows status read by collect_status.
+
+        Args:
+            status (dict | None): result of collect_status
+        """
         self.git_commit_tree.delete(*self.git_commit_tree.get_children())
         self.git_staged_changes.delete(
             *self.git_staged_changes.get_children())
@@ -89,59 +126,28 @@ class GitTab(tab_template.TabTemplate):
         self.git_branches["state"] = tk.DISABLED
         self.git_branches.unbind("<<ComboboxSelected>>")
         self.commit_button["state"] = tk.DISABLED
-        self.git_read_commits()
-        self.git_read_diffs()
-        if os.path.isdir(git_path := os.path.join(self.main.dir_path, ".git")):
-            repo = git.Repo(git_path)
-            branches = [branch.name for branch in repo.branches]
-            self.git_branches["values"] = branches
-            self.git_branches["state"] = "readonly"
-            self.git_branches.set(repo.active_branch)
-            self.git_branches.bind(
-                "<<ComboboxSelected>>", self.git_switch_branch)
-            self.commit_button["state"] = tk.ACTIVE
-
-    def git_read_commits(self):
-        """this func reads git commit log and makes git tree.
-        """
-        if os.path.isdir(git_path := os.path.join(self.main.dir_path, ".git")):
-            repo = git.Repo(git_path)
-            for commit in repo.iter_commits():
-                self.git_commit_tree.insert(
-                    "",
-                    tk.END,
-                    values=(
-                        commit.hexsha,
-                        commit.author.name,
-                        commit.authored_datetime,
-                        commit.message))
-        else:
+        if status is None:
             self.git_commit_tree.insert(
-                    "",
-                    tk.END,
-                    values=(
-                        "this directory",
-                        "is not",
-                        "a git",
-                        "repository"))
-
-    def git_read_diffs(self):
-        """this func reads git diffs and inserts into git_unstaged_changes.
-        """
-        if os.path.isdir(git_path := os.path.join(self.main.dir_path, ".git")):
-            repo = git.Repo(git_path)
-            diffs = repo.index.diff(None)
-            for diff in diffs:
-                a = diff.a_path
-                change_type = diff.change_type
-                self.git_unstaged_changes.insert(
-                    "", tk.END, values=(a, change_type))
-            diffs = repo.index.diff("HEAD")
-            for diff in diffs:
-                a = diff.a_path
-                change_type = diff.change_type
-                self.git_staged_changes.insert(
-                    "", tk.END, values=(a, change_type))
+                "",
+                tk.END,
+                values=(
+                    "this directory",
+                    "is not",
+                    "a git",
+                    "repository"))
+            return
+        for commit in status["commits"]:
+            self.git_commit_tree.insert("", tk.END, values=commit)
+        for diff in status["unstaged"]:
+            self.git_unstaged_changes.insert("", tk.END, values=diff)
+        for diff in status["staged"]:
+            self.git_staged_changes.insert("", tk.END, values=diff)
+        self.git_branches["values"] = status["branches"]
+        self.git_branches["state"] = "readonly"
+        self.git_branches.set(status["active_branch"])
+        self.git_branches.bind(
+            "<<ComboboxSelected>>", self.git_switch_branch)
+        self.commit_button["state"] = tk.ACTIVE
 
     def git_switch_branch(self, _: tk.Event):
         """this func switches local git branch
@@ -157,7 +163,7 @@ class GitTab(tab_template.TabTemplate):
                 messagebox.showerror(
                     title="git.exc.GitCommandError", message=str(e))
             else:
-                self.main.refresh_main()
+                self.main.publish(GIT_HEAD_CHANGED)
             finally:
                 self.git_branches.set(repo.active_branch)
 
@@ -227,7 +233,7 @@ class GitTab(tab_template.TabTemplate):
                         title="git.exc.CommandError",
                         message=str(e))
                 finally:
-                    self.main.refresh_main()
+                    self.main.publish(GIT_HEAD_CHANGED)
             else:
                 messagebox.showerror(
                     title="Commit message is Empty",
@@ -254,6 +260,8 @@ class GitMenu(tk.Menu):
                 except git.exc.GitCommandError as e:
                     messagebox.showerror(
                         title="git.exc.GitError", message=str(e))
+                else:
+                    self.main.publish(GIT_HEAD_CHANGED)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 """
 name: Linter
-version: "1.0.0"
+version: "1.5.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Tab
 description: Supports automatic execution of linters.
@@ -8,20 +8,118 @@ dependencies:
     - flake8: "^7.1.1"
     - pylint: "^3.2.7"
 settings: null
+host: process
 """
 
 import os
-import subprocess
-import threading
+import re
 import tkinter as tk
 from tkinter import ttk
 
+from PyProma_common.cancellation import run_command
 from PyProma_common.PyProma_templates import tab_template
-from PyProma_dir_view.plugins.plugin_manager import PyFileMethod, RefreshMethod
+from PyProma_dir_view.plugins.plugin_manager import (
+    PyFileRemovedMethod, PyFilesMethod, RefreshMethod)
+
+# "path:line:column: message" printed by flake8 and pylint
+RESULT_LINE = re.compile(r"^(.+?):(\d+):(\d+): ")
+# length of arguments of a command (the limit of Windows is 32767)
+COMMAND_LENGTH = 30000
+PYLINT_TEMPLATE = "{abspath}:{line}:{column}: {msg_id}: {msg} ({symbol})"
+
+
+def split_command(command: list, paths: list) -> list:
+    """this func splits paths so that each command stays shorter than
+    COMMAND_LENGTH.
+
+    Args:
+        command (list): command without paths
+        paths (list): paths to files
+
+    Returns:
+        list: commands with paths
+    """
+    commands = []
+    length = base_length = sum(len(arg) + 1 for arg in command)
+    for path in paths:
+        if not commands or length + len(path) + 1 > COMMAND_LENGTH:
+            commands.append(list(command))
+            length = base_length
+        commands[-1].append(path)
+        length += len(path) + 1
+    return commands
+
+
+def run_linters(
+        dir_path: str, target_paths: list, parallel: bool) -> dict:
+    """this func runs each linter in dir_path for files and groups
+    results per file.
+    both linters print "path:line:column: message" lines, so cached
+    results have one format whether a file was linted alone or not.
+
+    Args:
+        dir_path (str): path to project directory (linters run there)
+        target_paths (list): paths to .py files
+        parallel (bool): use parallelism of linters
+
+    Returns:
+        dict: path -> [flake8 results, pylint results] for every path
+    """
+    results = {path: [[], []] for path in target_paths}
+    paths = {
+        os.path.normcase(os.path.abspath(path)): path
+        for path in target_paths}
+    jobs = (["-j", "auto"], ["-j", "0"]) if parallel else ([], [])
+    linters = (
+        ["flake8", *jobs[0]],
+        ["pylint", *jobs[1], "--score=n", "--msg-template",
+         PYLINT_TEMPLATE])
+    for i, linter in enumerate(linters):
+        for command in split_command(linter, target_paths):
+            result = run_command(command, cwd=dir_path, text=True)
+            for line in result.stdout.splitlines():
+                if (match := RESULT_LINE.match(line)) is None:
+                    continue
+                path = paths.get(os.path.normcase(
+                    os.path.abspath(os.path.join(dir_path, match[1]))))
+                if path is not None:
+                    results[path][i].append(line)
+    return results
+
+
+def lint_file(target_path: str, dir_path: str) -> list:
+    """this func runs linters on a file.
+    this runs in the plugin host, so it must not touch widgets.
+    linters are killed when the refresh generation is over.
+
+    Args:
+        target_path (str): path to .py file
+        dir_path (str): path to project directory (linters run there)
+
+    Returns:
+        list: [flake8 results, pylint results]
+    """
+    return run_linters(dir_path, [target_path], False)[target_path]
+
+
+def lint_project(dir_path: str, target_paths: list) -> dict:
+    """this func runs each linter once for many files with its own
+    parallelism and groups results per file.
+    this runs in the plugin host, so it must not touch widgets.
+
+    Args:
+        dir_path (str): path to project directory (linters run there)
+        target_paths (list): paths to .py files
+
+    Returns:
+        dict: path -> [flake8 results, pylint results] for every path
+    """
+    return run_linters(dir_path, target_paths, True)
 
 
 class LinterTab(tab_template.TabTemplate):
     NAME = "Linter"
+    PROJECT_MODE_FILES = 8
 
     def __init__(self, master=None, main=None):
         super().__init__(master, main)
@@ -37,25 +135,62 @@ class LinterTab(tab_template.TabTemplate):
         self.result_tree.delete(
             *self.result_tree.get_children())
 
-    def start_linter(self, target_path):
-        result = subprocess.run(
-            ["pylint", target_path], capture_output=True, text=True)
-        pylint_results = result.stdout.splitlines()[1:-4]
-        result = subprocess.run(
-            ["flake8", target_path], capture_output=True, text=True)
-        flake8_results = result.stdout.splitlines()
+    def show_results(self, target_path: str, results: list):
+        """this func shows results of lint_file.
+
+        Args:
+            target_path (str): path to .py file
+            results (list): [flake8 results, pylint results]
+        """
+        flake8_results, pylint_results = results
+        self.forget_results(target_path)
         if len(pylint_results) > 0 or len(flake8_results) > 0:
             parent = self.result_tree.insert(
-                "", tk.END, text=target_path)
+                "", tk.END, iid=target_path, text=target_path)
             for result in flake8_results:
                 self.result_tree.insert(parent, tk.END, text=result)
             for result in pylint_results:
                 self.result_tree.insert(parent, tk.END, text=result)
 
-    @PyFileMethod
-    def run_linter(self, target_path):
-        if "venv" not in target_path:
-            if os.path.isfile(target_path):
-                thread = threading.Thread(
-                    target=lambda: self.start_linter(target_path))
-                thread.start()
+    @PyFilesMethod
+    def run_linter(self, target_paths: list):
+        """this func shows cached results of unchanged files and lints
+        the others in the plugin host.
+        if more than PROJECT_MODE_FILES files changed, each linter runs
+        once for all of them (project mode) instead of twice per file.
+
+        Args:
+            target_paths (list): paths to .py files
+        """
+        cache = self.main.result_cache(self.NAME)
+        keys = {}
+        for target_path in target_paths:
+            if not os.path.isfile(target_path):
+                continue
+            key = cache.key(target_path)
+            if (cached := cache.get(target_path, key=key)) is not None:
+                self.show_results(target_path, cached)
+            elif key:
+                keys[target_path] = key
+
+        def on_result(target_path: str, results: list):
+            cache.put(target_path, results, keys[target_path])
+            self.show_results(target_path, results)
+
+        def on_project_result(_: str, results: dict):
+            for target_path in sorted(results):
+                on_result(target_path, results[target_path])
+
+        if len(keys) > self.PROJECT_MODE_FILES:
+            self.main.run_batch(
+                self.NAME, "lint_project", [self.main.dir_path],
+                on_project_result, args=(list(keys),))
+        elif keys:
+            self.main.run_batch(
+                self.NAME, "lint_file", list(keys), on_result,
+                args=(self.main.dir_path,))
+
+    @PyFileRemovedMethod
+    def forget_results(self, target_path):
+        if self.result_tree.exists(target_path):
+            self.result_tree.delete(target_path)
@@ -1,11 +1,12 @@
 """
 name: Packages
-version: "1.5.0"
+version: "1.7.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Tab
 description: Supports packages, dependences management.
 dependencies: null
 settings: null
+refresh: concurrent
 """
 
 import importlib.metadata
@@ -19,6 +20,7 @@ import urllib
 import urllib.parse
 import webbrowser
 
+from PyProma_common.event_bus import PACKAGES_CHANGED
 from PyProma_common.PyProma_templates import tab_template
 from PyProma_dir_view.plugins.plugin_manager import RefreshMethod
 
@@ -76,19 +78,33 @@ class PackagesTab(tab_template.TabTemplate):
         self.is_poetry_in = False
         self.is_command_running = False
 
-    @RefreshMethod
-    def refresh(self):
+    def collect_packages(self) -> list | None:
         """this func gets python packages in environment.
+        this runs in a worker thread, so it must not touch widgets.
+
+        Returns:
+            list | None: (name, version) of packages or None if there is
+                no site-packages
+        """
+        site_packages_dir = os.path.join(
+            self.main.dir_path, ".venv", "Lib", "site-packages")
+        if not os.path.isdir(site_packages_dir):
+            return None
+        return [
+            (dist.name, dist.version)
+            for dist in importlib.metadata.distributions(
+                path=[site_packages_dir])]
+
+    @RefreshMethod(collect="collect_packages", events=(PACKAGES_CHANGED,))
+    def refresh(self, packages: list | None):
+        """this func shows packages got by collect_packages.
+
+        Args:
+            packages (list | None): result of collect_packages
         """
         if os.path.isdir(self.main.dir_path):
             self.packages_tree.delete(*self.packages_tree.get_children())
-            site_packages_dir = os.path.join(
-                self.main.dir_path, ".venv", "Lib", "site-packages")
-            if os.path.isdir(site_packages_dir):
-                packages = []
-                for dist in importlib.metadata.distributions(
-                        path=[site_packages_dir]):
-                    packages.append((dist.name, dist.version))
+            if packages is not None:
                 for package in packages:
                     self.packages_tree.insert("", tk.END, values=package)
                 self.is_poetry_in = any(
@@ -144,7 +160,7 @@ class PackagesTab(tab_template.TabTemplate):
             finally:
                 _output_queue.put("DONE")
                 self.is_command_running = False
-                self.main.refresh_main()
+                self.main.publish(PACKAGES_CHANGED)
 
         def _update_output():
             while True:
@@ -1,6 +1,6 @@
 """
 name: pip
-version: "1.1.0"
+version: "1.2.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Menu
 description: Supports pip operations.
@@ -14,6 +14,7 @@ import tkinter as tk
 from tkinter import messagebox, simpledialog
 
 from PyProma_common.code_runner import CodeRunner
+from PyProma_common.event_bus import FILES_CHANGED, PACKAGES_CHANGED
 
 
 class PipMenu(tk.Menu):
@@ -42,7 +43,7 @@ class PipMenu(tk.Menu):
                     venv_path if os.path.isfile(venv_path) else "python",
                     "-m", "pip", "install", package]
                 CodeRunner.code_runner(command, cwd=self.main.dir_path)
-                self.main.refresh_main()
+                self.main.publish(PACKAGES_CHANGED)
 
     def upgrade_pip(self):
         if os.path.isdir(self.main.dir_path):
@@ -68,7 +69,8 @@ class PipMenu(tk.Menu):
                 messagebox.showerror(
                     title="subprocess.CalledProcessError", message=str(e))
             finally:
-                self.main.refresh_main()
+                self.main.publish(FILES_CHANGED, [os.path.join(
+                    self.main.dir_path, "requirements.txt")])
 
     @staticmethod
     def get_venv_path():
@@ -1,17 +1,57 @@
-import importlib.util
-import inspect
+import fnmatch
 import os
 import tkinter as tk
-from functools import wraps
-from textwrap import dedent
-from tkinter import messagebox
+from functools import partial, wraps
+
+from PyProma_common.event_bus import FILES_CHANGED, GIT_HEAD_CHANGED
+from PyProma_common.hook_registry import (
+    PYFILE, PYFILE_REMOVED, PYFILES, REFRESH, each_path, hook_method)
+from PyProma_common.plugin_loader import PluginLoader
+from PyProma_common.project_index import ProjectIndex
+from PyProma_common.result_cache import (
+    PluginCache, ResultCache, result_cache_path)
+
+# files of .git which change when a branch is switched or a commit is made
+GIT_HEAD_FILES = (".git/HEAD", ".git/packed-refs")
+
+
+def RefreshMethod(
+        method=None, *, priority: int = 0, collect: str = None,
+        events: tuple = ()):
+    if method is None:
+        return partial(
+            RefreshMethod, priority=priority, collect=collect, events=events)
+    method.__is_refresh_method__ = True
+    if collect is not None:
+        method.__collect__ = collect
+    hook_method(REFRESH, priority)(method)
+    for event in events:
+        hook_method(event, priority)(method)
 
-import inflection
-from PyProma_common.PyProma_templates import tab_template
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return method(self, *args, **kwargs)
+    return wrapper
 
 
-def RefreshMethod(method):
-    method.__is_refresh_method__ = True
+def EventMethod(*events: str, priority: int = 0):
+    def decorator(method):
+        method.__is_event_method__ = True
+        for event in events:
+            hook_method(event, priority)(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def PyFileMethod(method=None, *, priority: int = 0):
+    if method is None:
+        return partial(PyFileMethod, priority=priority)
+    method.__is_pyfile_method__ = True
+    hook_method(PYFILE, priority)(method)
 
     @wraps(method)
     def wrapper(self, *args, **kwargs):
@@ -19,8 +59,11 @@ def RefreshMethod(method):
     return wrapper
 
 
-def PyFileMethod(method):
-    method.__is_pyfile_method__ = True
+def PyFilesMethod(method=None, *, priority: int = 0):
+    if method is None:
+        return partial(PyFilesMethod, priority=priority)
+    method.__is_pyfiles_method__ = True
+    hook_method(PYFILES, priority)(method)
 
     @wraps(method)
     def wrapper(self, *args, **kwargs):
@@ -28,81 +71,152 @@ def PyFileMethod(method):
     return wrapper
 
 
-class PluginManager:
+def PyFileRemovedMethod(method=None, *, priority: int = 0):
+    if method is None:
+        return partial(PyFileRemovedMethod, priority=priority)
+    method.__is_pyfile_removed_method__ = True
+    hook_method(PYFILE_REMOVED, priority)(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class PluginManager(PluginLoader):
+    PLUGIN_DIR = os.path.dirname(__file__)
+
     def __init__(self, main):
-        """this func loads and adds tabs, menus from tabs directory.
+        """this func adds placeholders of tabs, menus in plugins directory.
+        plugins are loaded when their tab is selected or menu is opened.
+        """
+        self.index = ProjectIndex()
+        # True while the index is scanned or a cached one is revalidated
+        self.scanning = False
+        self.results = None
+        self.plugin_caches = {}
+        super().__init__(main)
+
+    def register_tab(self, tab_name: str, tab: tk.Frame):
+        self.hooks.register_plugin(
+            tab_name, tab, {PYFILE: (PYFILES, each_path)})
+
+    def plugin_loaded(self, tab_name: str):
+        """this func refreshes a tab loaded after startup and passes .py
+        files to it if the scan is finished.
+        a cached index is complete while it is revalidated, but its files
+        are passed to every tab when the scan finishes, so they are not
+        passed here then.
+
+        Args:
+            tab_name (str): name of tab
         """
-        self.tabs = {}
-        self.menus = {}
-        self.main = main
-        for filename in os.listdir(os.path.dirname(__file__)):
-            if filename.endswith("_plugin.py"):
-                module_name = filename[:-3]
-                module_path = os.path.join(os.path.dirname(__file__), filename)
-                spec = importlib.util.spec_from_file_location(
-                    module_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                try:
-                    spec.loader.exec_module(module)
-                except ImportError as e:
-                    message = f"Failed to import module '{module_name}': {e}"
-                    messagebox.showerror(title="ImportError", message=message)
-                    continue
-
-                tab_class_name = inflection.camelize(module_name[:-7])+"Tab"
-                if hasattr(module, tab_class_name):
-                    tab_class = getattr(module, tab_class_name)
-                    if issubclass(tab_class, tab_template.TabTemplate):
-                        tab = tab_class(main.tab, self)
-                        tab_name = getattr(tab_class, "NAME", tab_class_name)
-                        main.tab.add(tab, text=tab_name, padding=3)
-                        self.tabs[tab_name] = tab
-                    elif issubclass(tab_class, tk.Frame):
-                        tab = tab_class(main.tab)
-                        tab_name = getattr(tab_class, "NAME", tab_class_name)
-                        message = f"""\
-                        {tab_name} is a tkinter frame but might not a tab.
-                        do you want to load anyway?"""
-                        confirm = messagebox.askyesno(
-                            title="confirm", message=dedent(message))
-                        if confirm:
-                            main.tab.add(tab, text=tab_name, padding=3)
-                            self.tabs[tab_name] = tab
-
-                menu_class_name = inflection.camelize(module_name[:-7])+"Menu"
-                if hasattr(module, menu_class_name):
-                    menu_class = getattr(module, menu_class_name)
-                    if issubclass(menu_class, tk.Menu):
-                        menu = menu_class(main.main_menu, self)
-                        menu_name = getattr(
-                            menu_class, "NAME", menu_class_name)
-                        main.main_menu.add_cascade(label=menu_name, menu=menu)
-                        self.menus[menu_name] = menu
-
-    def refresh_plugins(self):
-        for plugin in self.tabs.values():
-            for name, method in inspect.getmembers(plugin):
-                if (
-                        inspect.ismethod(method)
-                        and hasattr(method, "__is_refresh_method__")
-                        and method.__is_refresh_method__):
-                    method()
+        super().plugin_loaded(tab_name)
+        if not self.scanning and self.index.complete and (
+                hooks := self.hooks.hooks(PYFILES, tab_name)):
+            paths = list(self.index.iter_files(".py"))
+            for method in hooks:
+                self.hooks.invoke(tab_name, PYFILES, method, paths)
 
     def run_pyfile_plugin(self, path: str):
         if os.path.isfile(path) and path.endswith(".py"):
-            for tab in self.tabs.values():
-                for name, method in inspect.getmembers(tab):
-                    if (
-                            inspect.ismethod(method)
-                            and hasattr(method, "__is_pyfile_method__")
-                            and method.__is_pyfile_method__):
-                        method(path)
-
-    def __getitem__(self, key: str) -> dict:
-        if key == "tab":
-            return self.tabs
-        elif key == "menu":
-            return self.menus
+            self._run_pyfile_methods([path])
+
+    def run_pyfile_plugins(self):
+        """this func passes every .py file in index to plugins at once.
+        """
+        self._run_pyfile_methods(list(self.index.iter_files(".py")))
+
+    def _run_pyfile_methods(self, paths: list):
+        """this func calls PyFilesMethod with paths.
+        PyFileMethod is registered as a PyFilesMethod which is called
+        for each path.
+
+        Args:
+            paths (list): paths to .py files
+        """
+        if paths:
+            self.hooks.call(PYFILES, paths)
+
+    def notify_changes(
+            self, changed: list, removed: list, publish: bool = True):
+        """this func notifies only plugins interested in changed paths.
+        changed .py files go to PyFilesMethod at once, removed ones to
+        PyFileRemovedMethod, and tabs whose WATCH_PATTERNS match a path
+        are refreshed. FILES_CHANGED is published with the paths, and
+        GIT_HEAD_CHANGED if HEAD, packed-refs or a ref of .git changed.
+        changes of .git/index refresh tabs watching it (e.g. Git).
+
+        Args:
+            changed (list): paths created or modified
+            removed (list): paths deleted
+            publish (bool, optional): publish events. False if they are
+                already published. Defaults to True.
+        """
+        self._run_pyfile_methods([
+            path for path in changed
+            if path.endswith(".py") and os.path.isfile(path)])
+        for path in removed:
+            if path.endswith(".py"):
+                self.hooks.call(PYFILE_REMOVED, path)
+        relpaths = [
+            os.path.relpath(path, self.dir_path).replace("\\", "/")
+            for path in changed + removed]
+        for name, tab in self.tabs.items():
+            patterns = getattr(tab, "WATCH_PATTERNS", ())
+            trigger = next((
+                relpath for relpath in relpaths
+                if any(
+                    fnmatch.fnmatch(relpath, pattern)
+                    for pattern in patterns)), None)
+            if trigger is not None:
+                for method in self.hooks.hooks(REFRESH, name):
+                    self.run_refresh(name, method, trigger)
+        if publish and relpaths:
+            self.publish(FILES_CHANGED, changed + removed)
+            if any(
+                    relpath in GIT_HEAD_FILES
+                    or relpath.startswith(".git/refs/")
+                    for relpath in relpaths):
+                self.publish(GIT_HEAD_CHANGED)
+
+    def result_cache(
+            self, tab_name: str, content_hash: bool = False) -> PluginCache:
+        """this func gives a plugin its persistent result cache.
+        results are kept per project and dropped when the version in
+        metadata of the plugin changes.
+
+        Args:
+            tab_name (str): name of tab
+            content_hash (bool, optional): key files by SHA-1 of contents
+                instead of mtime and size. Defaults to False.
+
+        Returns:
+            PluginCache: cache of tab_name for the current project
+        """
+        path = (
+            result_cache_path(self.dir_path)
+            if os.path.isdir(self.dir_path) else ":memory:")
+        if self.results is None or self.results.path != path:
+            if self.results is not None:
+                self.results.close()
+            self.results = ResultCache(path)
+            self.plugin_caches = {}
+        cache = self.plugin_caches.get(tab_name)
+        if cache is None or cache.content_hash != content_hash:
+            version = self.metadata.get(
+                self.tab_modules.get(tab_name), {}).get("version")
+            cache = PluginCache(
+                self.results, tab_name, str(version), content_hash)
+            self.plugin_caches[tab_name] = cache
+        return cache
+
+    def close(self):
+        super().close()
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+            self.plugin_caches = {}
 
     def refresh_main(self):
         self.main.refresh_trees()
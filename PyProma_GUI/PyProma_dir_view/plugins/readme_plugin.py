@@ -1,6 +1,6 @@
 """
 name: README
-version: "1.2.0"
+version: "1.3.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Tab
 description: README viewer.
@@ -8,6 +8,7 @@ dependencies:
     - markdown: "^3.7"
     - tkhtmlview: "^0.3.1"
 settings: null
+refresh: concurrent
 """
 
 import os
@@ -21,6 +22,7 @@ from tkhtmlview import HTMLLabel
 
 class ReadmeTab(tab_template.TabTemplate):
     NAME = "README"
+    WATCH_PATTERNS = ("README.md",)
 
     def __init__(self, master=None, main=None):
         super().__init__(master, main)
@@ -29,17 +31,27 @@ class ReadmeTab(tab_template.TabTemplate):
             "<p>There is no README.md in this directory.</p>")
         self.readme_htmlview.pack(fill=tk.BOTH, expand=True)
 
-    @RefreshMethod
-    def read_readme(self):
-        """this func reads README.md and writes on readme_text.
+    def render_readme(self) -> str:
+        """this func reads README.md and converts it to html.
+        this runs in a worker thread, so it must not touch widgets.
+
+        Returns:
+            str: html
         """
         readme_path = os.path.join(self.main.dir_path, "README.md")
         if os.path.isfile(readme_path):
             with open(readme_path, "r", encoding="utf-8") as f:
                 text = f.read()
-            html = markdown.markdown(text)
-        else:
-            html = "<p>There is no README.md in this directory.</p>"
+            return markdown.markdown(text)
+        return "<p>There is no README.md in this directory.</p>"
+
+    @RefreshMethod(collect="render_readme")
+    def read_readme(self, html: str):
+        """this func writes html made by render_readme on readme_text.
+
+        Args:
+            html (str): result of render_readme
+        """
         self.readme_htmlview.set_html(html)
 
 
@@ -1,63 +1,341 @@
 """
 name: ToDo
-version: "1.0.0"
+version: "1.4.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Tab
 description: Scann comments in .py file and display ToDos.
 dependencies: null
 settings: null
+host: pool
 """
 
-import re
+import bisect
+import os
+import time
 import tkinter as tk
 import tkinter.ttk as ttk
+from tkinter import simpledialog
 
+from PyProma_common.event_bus import FILES_CHANGED, SETTINGS_CHANGED
 from PyProma_common.PyProma_templates import tab_template
-from PyProma_dir_view.plugins.plugin_manager import PyFileMethod, RefreshMethod
+from PyProma_common.result_cache import file_key
+from PyProma_common.todo_index import TodoIndex, todo_index_path
+from PyProma_common.todo_scanner import (
+    TEXT_SUFFIXES, load_todo_tags, load_todo_text_files, save_todo_tags,
+    save_todo_text_files, scan_todo)
+from PyProma_dir_view.plugins.plugin_manager import (
+    EventMethod, PyFileRemovedMethod, PyFilesMethod, RefreshMethod)
+
+
+def find_todo(filename: str, tags: tuple) -> list:
+    """this func finds todos of a file in a worker of the process pool,
+    so it must not touch widgets.
+
+    Args:
+        filename (str): path to file
+        tags (tuple): tags such as "TODO"
+
+    Returns:
+        list: (tag, line number, text)
+    """
+    return scan_todo(filename, tags)
 
 
 class TodoTab(tab_template.TabTemplate):
     NAME = "ToDo"
+    ALL_TAGS = "All"
+    RENDER_DELAY = 100
 
     def __init__(self, master=None, main=None):
         super().__init__(master, main)
-        self.todo_tree = ttk.Treeview(self, show=["tree", "headings"])
+        self.filter_frame = tk.Frame(self)
+        self.filter_frame.pack(fill=tk.X)
+        self.tag_filter = tk.StringVar(self, self.ALL_TAGS)
+        self.tag_combo = ttk.Combobox(
+            self.filter_frame, textvariable=self.tag_filter,
+            state="readonly", width=10)
+        self.tag_combo.pack(side=tk.LEFT)
+        tk.Label(self.filter_frame, text="path").pack(side=tk.LEFT)
+        self.path_filter = tk.StringVar(self)
+        tk.Entry(
+            self.filter_frame, textvariable=self.path_filter,
+            width=25).pack(side=tk.LEFT)
+        tk.Label(self.filter_frame, text="search").pack(side=tk.LEFT)
+        self.text_filter = tk.StringVar(self)
+        tk.Entry(
+            self.filter_frame, textvariable=self.text_filter,
+            width=25).pack(side=tk.LEFT)
+        for variable in (self.tag_filter, self.path_filter, self.text_filter):
+            variable.trace_add("write", lambda *_: self.schedule_render())
+        self.count_label = tk.Label(self, anchor=tk.W)
+        self.count_label.pack(fill=tk.X)
+
+        self.todo_tree = ttk.Treeview(
+            self, show=["tree", "headings"], columns=("first_seen",))
         self.todo_tree.heading("#0", text="ToDo", anchor=tk.CENTER)
+        self.todo_tree.heading(
+            "first_seen", text="first seen", anchor=tk.CENTER)
+        self.todo_tree.column("first_seen", width=120, stretch=False)
         self.todo_tree.pack(fill=tk.BOTH, expand=True)
+        self.tags = load_todo_tags()
+        self.tag_combo["values"] = [self.ALL_TAGS] + self.tags
+        self.text_files = tk.BooleanVar(self, load_todo_text_files())
+        self.text_files_pending = False
+        self.index = None
+        self.render_job = None
+
+        self.todo_menu = tk.Menu(self, tearoff=False)
+        self.todo_menu.add_command(label="Edit tags", command=self.edit_tags)
+        self.todo_menu.add_checkbutton(
+            label="Scan text files", variable=self.text_files,
+            command=self.toggle_text_files)
+        self.todo_tree.bind("<Button-3>", self.todo_tree_on_right_click)
+
+    def todo_index(self) -> TodoIndex:
+        """this func opens the index of the current project.
+
+        Returns:
+            TodoIndex: index stored in the cache directory
+        """
+        path = (
+            todo_index_path(self.main.dir_path)
+            if os.path.isdir(self.main.dir_path) else ":memory:")
+        if self.index is None or self.index.path != path:
+            if self.index is not None:
+                self.index.close()
+            self.index = TodoIndex(path)
+        self.index.set_tags(self.tags)
+        return self.index
 
     @RefreshMethod
     def refresh(self):
-        self.todo_tree.delete(*self.todo_tree.get_children())
+        self.todo_index()
+        self.render()
+        self.text_files_pending = True
 
-    @PyFileMethod
-    def find_todo(self, filename: str):
-        """this func finds todos and add node to todo_tree.
-        this finds "# TODO", "# BUG", "# FIXME", "# HACK".
+    @PyFilesMethod
+    def find_todos(self, filenames: list):
+        """this func updates the index with todos of files. files which
+        didn't change since they were indexed are skipped, and the others
+        are scanned in chunks in a process pool.
+        on the first call after refresh, files which are no longer in the
+        project are removed, and text files in TEXT_SUFFIXES are added if
+        they are enabled.
+
+        Args:
+            filenames (list): paths to .py files
+        """
+        index = self.todo_index()
+        if self.text_files_pending and self.main.index.complete:
+            files = set(self.main.index.iter_files())
+            if self.text_files.get():
+                filenames = list(filenames) + [
+                    path for path in files if path.endswith(TEXT_SUFFIXES)]
+            index.retain({
+                path for path in files
+                if path.endswith(".py") or (
+                    self.text_files.get() and path.endswith(TEXT_SUFFIXES))})
+            self.schedule_render()
+        self.text_files_pending = False
+        keys = {}
+        for filename in sorted(filenames):
+            key = file_key(filename)
+            if key is None:
+                self.forget_todo(filename)
+            elif key != index.key(filename):
+                keys[filename] = key
+
+        def on_result(filename: str, comments: list):
+            index.update(filename, keys[filename], comments)
+            self.render_file(filename)
+
+        def on_done():
+            index.commit()
+            self.render()
+
+        if keys:
+            self.main.run_batch(
+                self.NAME, "find_todo", list(keys), on_result,
+                on_done=on_done, args=(tuple(self.tags),))
+
+    @PyFileRemovedMethod
+    def forget_todo(self, filename: str):
+        """this func removes todos of filename from the index.
 
         Args:
             filename (string): path to .py file
         """
-        if "venv" not in filename:
-            with open(filename, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            comments = []
-            for i, line in enumerate(lines):
-                match = re.search(r"#\s*(TODO|BUG|FIXME|HACK)\s+(.*)", line)
-                if match:
-                    tag, text = match.groups()
-                    comments.append(
-                        [tag, i + 1, text])
-
-            if len(comments) > 0:
-                parent = self.todo_tree.insert(
-                    "",
-                    tk.END,
-                    text=filename.replace(self.main.dir_path + "\\", ""))
-                for tag, line_no, todo_text in comments:
-                    self.todo_tree.insert(
-                        parent,
-                        tk.END,
-                        text=f"{tag} {todo_text}(line {line_no})")
+        self.todo_index().remove(filename)
+        self.render_file(filename)
+
+    def schedule_render(self):
+        if self.render_job is None:
+            self.render_job = self.after(self.RENDER_DELAY, self.render)
+
+    def filters(self) -> tuple:
+        """this func reads the filter bar.
+
+        Returns:
+            tuple: (tag, path prefix, text) for TodoIndex.query
+        """
+        tag = self.tag_filter.get()
+        prefix = self.path_filter.get().strip()
+        return (
+            None if tag == self.ALL_TAGS else tag,
+            os.path.join(self.main.dir_path, prefix) if prefix else None,
+            self.text_filter.get().strip() or None)
+
+    def render(self):
+        """this func shows todos in the index which match the filters,
+        grouped by directory and file with their counts.
+        it rebuilds todo_tree, so it is used when filters change or a
+        batch is done. render_file updates one file while results arrive.
+        """
+        if self.render_job is not None:
+            self.after_cancel(self.render_job)
+            self.render_job = None
+        if self.index is None:
+            return
+        tag, prefix, text = self.filters()
+        counts = self.index.count_tags(prefix, text)
+        self.count_label["text"] = "  ".join(
+            f"{tag_name}: {counts.get(tag_name, 0)}"
+            for tag_name in self.tags)
+
+        opened = {
+            iid for iid in self.todo_tree.get_children()
+            if self.todo_tree.item(iid, "open")}
+        self.todo_tree.delete(*self.todo_tree.get_children())
+        groups = {}
+        for row in self.index.query(tag, prefix, text):
+            directory = os.path.dirname(
+                os.path.relpath(row[0], self.main.dir_path))
+            groups.setdefault(directory, {}).setdefault(
+                row[0], []).append(row)
+        for directory, files in sorted(groups.items()):
+            parent = self.todo_tree.insert(
+                "", tk.END, iid="dir:" + directory,
+                open="dir:" + directory in opened)
+            for path, rows in files.items():
+                self.insert_file(parent, tk.END, path, rows)
+            self.update_dir_count(parent)
+
+    def render_file(self, path: str):
+        """this func replaces the node of path with its todos in the
+        index which match the filters.
+
+        Args:
+            path (str): path to file
+        """
+        if self.index is None:
+            return
+        if self.todo_tree.exists(path):
+            self.todo_tree.delete(path)
+        directory = "dir:" + os.path.dirname(
+            os.path.relpath(path, self.main.dir_path))
+        if rows := self.index.query(*self.filters(), path=path):
+            if not self.todo_tree.exists(directory):
+                self.todo_tree.insert(
+                    "", bisect.bisect(
+                        self.todo_tree.get_children(), directory),
+                    iid=directory)
+            self.insert_file(
+                directory, bisect.bisect(
+                    self.todo_tree.get_children(directory), path),
+                path, rows)
+        if self.todo_tree.exists(directory):
+            self.update_dir_count(directory)
+
+    def insert_file(self, parent: str, position, path: str, rows: list):
+        """this func inserts a file node and its todos.
+
+        Args:
+            parent (str): node of directory
+            position (int | str): position in parent
+            path (str): path to file (iid of node)
+            rows (list): rows of path made by TodoIndex.query
+        """
+        node = self.todo_tree.insert(
+            parent, position, iid=path,
+            text=f"{os.path.basename(path)} ({len(rows)})")
+        for _, line_no, tag_name, todo_text, first_seen in rows:
+            self.todo_tree.insert(
+                node, tk.END,
+                text=f"{tag_name} {todo_text}(line {line_no})",
+                values=(time.strftime(
+                    "%Y-%m-%d %H:%M", time.localtime(first_seen)),))
+
+    def update_dir_count(self, node: str):
+        """this func shows the number of todos of a directory node and
+        removes it if it has none.
+
+        Args:
+            node (str): node of directory ("dir:" + relative path)
+        """
+        count = sum(
+            len(self.todo_tree.get_children(child))
+            for child in self.todo_tree.get_children(node))
+        if count:
+            self.todo_tree.item(node, text=f"{node[4:] or '.'} ({count})")
+        else:
+            self.todo_tree.delete(node)
+
+    def destroy(self):
+        if self.render_job is not None:
+            self.after_cancel(self.render_job)
+            self.render_job = None
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        super().destroy()
+
+    def todo_tree_on_right_click(self, event: tk.Event):
+        self.todo_menu.post(event.x_root, event.y_root)
+
+    def edit_tags(self):
+        """this func asks tags separated by spaces and saves them.
+        """
+        tags = simpledialog.askstring(
+            "Edit tags", "type tags separated by spaces",
+            initialvalue=" ".join(self.tags))
+        if tags is not None and tags.split():
+            save_todo_tags(tags.split())
+            self.main.publish(SETTINGS_CHANGED, "todo_tags")
+
+    def toggle_text_files(self):
+        save_todo_text_files(self.text_files.get())
+        self.main.publish(SETTINGS_CHANGED, "todo_text_files")
+
+    @EventMethod(SETTINGS_CHANGED)
+    def on_settings_changed(self, name: str):
+        """this func scans every file again with new settings.
+
+        Args:
+            name (str): name of changed setting
+        """
+        if name not in ("todo_tags", "todo_text_files"):
+            return
+        self.tags = load_todo_tags()
+        self.tag_combo["values"] = [self.ALL_TAGS] + self.tags
+        if self.tag_filter.get() not in self.tags:
+            self.tag_filter.set(self.ALL_TAGS)
+        self.text_files.set(load_todo_text_files())
+        self.refresh()
+        self.find_todos(list(self.main.index.iter_files(".py")))
+
+    @EventMethod(FILES_CHANGED)
+    def on_files_changed(self, paths: list):
+        """this func scans changed text files if they are enabled.
+        .py files are passed to find_todos by the plugin manager.
+
+        Args:
+            paths (list): changed or removed paths
+        """
+        if not self.text_files.get():
+            return
+        paths = [path for path in paths if path.endswith(TEXT_SUFFIXES)]
+        if paths:
+            self.find_todos(paths)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 """
 name: venv
-version: "1.1.0"
+version: "1.2.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Menu
 description: Supports venv operations.
@@ -13,6 +13,8 @@ import subprocess
 import venv
 from tkinter import Menu, messagebox
 
+from PyProma_common.event_bus import FILES_CHANGED, PACKAGES_CHANGED
+
 
 class VenvMenu(Menu):
     NAME = "venv"
@@ -34,4 +36,5 @@ class VenvMenu(Menu):
             except OSError as e:
                 messagebox.showerror(
                     title="OSError", message=str(e))
-            self.main.refresh_main()
+            self.main.publish(FILES_CHANGED, [venv_path])
+            self.main.publish(PACKAGES_CHANGED)
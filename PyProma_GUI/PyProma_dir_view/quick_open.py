@@ -0,0 +1,66 @@
+import os
+import tkinter as tk
+
+
+class QuickOpen(tk.Toplevel):
+    LIMIT = 50
+
+    def __init__(self, master: tk.Tk):
+        """this constructor makes a box to find files by fuzzy query.
+        the chosen file is revealed in dir_tree of master.
+
+        Args:
+            master (tkinter.Tk): DirView which has finder and reveal_path
+        """
+        super().__init__(master)
+        self.main = master
+        self.title("Quick open")
+        self.geometry("500x300")
+        self.transient(master)
+        self.query = tk.StringVar(self)
+        self.entry = tk.Entry(self, textvariable=self.query)
+        self.entry.pack(fill=tk.X)
+        self.result_list = tk.Listbox(self, activestyle=tk.NONE)
+        self.result_list.pack(fill=tk.BOTH, expand=True)
+        self.query.trace_add("write", lambda *_: self.update_results())
+        self.entry.bind("<Down>", lambda _: self.move_selection(1))
+        self.entry.bind("<Up>", lambda _: self.move_selection(-1))
+        self.entry.bind("<Return>", lambda _: self.choose())
+        self.result_list.bind("<Double-1>", lambda _: self.choose())
+        self.bind("<Escape>", lambda _: self.destroy())
+        self.entry.focus_set()
+
+    def update_results(self):
+        """this func searches finder of master and shows results.
+        """
+        self.result_list.delete(0, tk.END)
+        for path in self.main.finder.search(self.query.get(), self.LIMIT):
+            self.result_list.insert(tk.END, path)
+        if self.result_list.size():
+            self.result_list.selection_set(0)
+
+    def move_selection(self, step: int) -> str:
+        """this func moves selection in results.
+
+        Args:
+            step (int): 1 for down and -1 for up
+
+        Returns:
+            str: "break" to keep the cursor of entry
+        """
+        if size := self.result_list.size():
+            selection = self.result_list.curselection()
+            current = selection[0] if selection else -step
+            current = min(max(current + step, 0), size - 1)
+            self.result_list.selection_clear(0, tk.END)
+            self.result_list.selection_set(current)
+            self.result_list.see(current)
+        return "break"
+
+    def choose(self):
+        """this func reveals selected file in dir_tree and closes box.
+        """
+        if selection := self.result_list.curselection():
+            relpath = self.result_list.get(selection[0])
+            self.destroy()
+            self.main.reveal_path(os.path.join(self.main.dir_path, relpath))
@@ -21,7 +21,8 @@ json_template = {
         "project_names": [],
         "dir_paths": []
     },
-    "schedule": []
+    "schedule": [],
+    "excludes": {}
 }
 
 
@@ -79,6 +80,7 @@ class ProjectView(tk.Tk):
         self.tab.pack(anchor=tk.NW)
         self.tab.enable_traversal()
         self.plugins = plugin_manager.PluginManager(self)
+        self.dir_view = None
         self.bind("<Control-r>", lambda event: self.refresh_trees())
         self.refresh_trees()
         self.mainloop()
@@ -244,7 +246,9 @@ class ProjectView(tk.Tk):
         add_project_window.mainloop()
 
     def open_project(self, _=None):
-        """this func opens selected project_view.
+        """this func opens selected project in the dir view.
+        the dir view is made once and reused for other projects, so
+        plugins are not loaded again.
         """
         if self.project_tree.selection():
             selected_project = self.project_tree.selection()[0]
@@ -252,8 +256,13 @@ class ProjectView(tk.Tk):
                 self.project_tree.item(selected_project, "text"))
             project_name = self.projects["projects"]["project_names"][index]
             dir_path = self.projects["projects"]["dir_paths"][index]
-            self.destroy()
-            PyProma_dir_view_script.DirView(project_name, dir_path)
+            self.withdraw()
+            if self.dir_view is None:
+                self.dir_view = PyProma_dir_view_script.DirView(
+                    project_name, dir_path, master=self,
+                    on_back=self.deiconify)
+            else:
+                self.dir_view.open_project(project_name, dir_path)
 
     def remove_project(self):
         """this func removes selected project.
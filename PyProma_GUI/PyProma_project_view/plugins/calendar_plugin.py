@@ -1,6 +1,6 @@
 """
 name: Calendar
-version: "1.0.0"
+version: "1.1.0"
 author: rikeidanshi <rikeidanshi@duck.com>
 type: Tab
 description: Supports schedule management related to projects.
@@ -14,6 +14,7 @@ import tkinter.ttk as ttk
 from calendar import monthrange
 from datetime import datetime
 
+from PyProma_common.event_bus import SETTINGS_CHANGED
 from PyProma_common.PyProma_templates import tab_template
 from PyProma_project_view.plugins.plugin_manager import RefreshMethod
 
@@ -51,7 +52,7 @@ class CalendarTab(tab_template.TabTemplate):
         self.calender_tree.bind(
             "<Button-3>", self.calendar_tree_on_right_click)
 
-    @RefreshMethod
+    @RefreshMethod(events=(SETTINGS_CHANGED,))
     def refresh(self):
         self.calender_tree.delete(*self.calender_tree.get_children())
         for schedule in self.projects["schedule"]:
@@ -78,7 +79,7 @@ class CalendarTab(tab_template.TabTemplate):
                 with open(json_path, "w") as f:
                     json.dump(self.projects, f, indent=4)
                 add_schedule_window.destroy()
-                self.main.refresh_main()
+                self.main.publish(SETTINGS_CHANGED, "schedule")
             else:
                 return
 
@@ -170,7 +171,7 @@ class CalendarTab(tab_template.TabTemplate):
             list(self.calender_tree.item(selected_schedule, "values")))
         with open(json_path, "w") as f:
             json.dump(self.projects, f, indent=4)
-        self.main.refresh_main()
+        self.main.publish(SETTINGS_CHANGED, "schedule")
 
     def calendar_tree_on_right_click(self, event: tk.Event):
         """this func shows right-clicked menu.
@@ -0,0 +1,15 @@
+"""
+name: Performance
+version: "1.0.0"
+author: rikeidanshi <rikeidanshi@duck.com>
+type: Tab
+description: Shows call counts and times of plugin hooks.
+dependencies: null
+settings: null
+"""
+
+from PyProma_common.performance_view import PerformanceView
+
+
+class PerformanceTab(PerformanceView):
+    NAME = "Performance"